@@ -4,12 +4,16 @@ ncOS Project Consolidation and Remapping Tool
 Consolidates and reorganizes the ncOS project structure
 """
 
+import functools
 import json
 import logging
+import os
+import re
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, Tuple
 
 import yaml
 
@@ -20,6 +24,133 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Config loading is I/O bound, so oversubscribe the CPUs
+MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Zero-width alternation so overlapping keywords are all reported in one scan
+_CATEGORY_RE = re.compile(r'(?=(?P<agents>agent)|(?P<engines>engine)|(?P<models>model)|(?P<api>api|route))')
+_CATEGORY_PRIORITY = ('agents', 'engines', 'models', 'api')
+
+# Static remainder of CONSOLIDATION_SUMMARY.md after the target directory line
+_SUMMARY_TAIL = (
+    '├── src/\n',
+    '│   ├── core/       # Core system components\n',
+    '│   ├── engines/    # Engine implementations\n',
+    '│   ├── agents/     # Agent implementations\n',
+    '│   ├── api/        # API layer\n',
+    '│   └── models/     # Data models\n',
+    '├── config/         # Consolidated configurations\n',
+    '├── tests/          # Test suite\n',
+    '├── scripts/        # Utility scripts\n',
+    '└── docs/           # Documentation\n',
+    '```\n',
+    '\n',
+    '## Next Steps\n',
+    '1. Review the consolidation report\n',
+    '2. Update import statements in Python files\n',
+    '3. Run tests to ensure functionality\n',
+    '4. Update documentation\n',
+)
+
+# Files with a fixed destination in the new layout
+_MIGRATION_RULES = {
+    'main.py': 'src/api/main.py',
+    'config.py': 'src/core/config.py',
+    'utils.py': 'src/core/utils.py',
+    'base_agent.py': 'src/agents/base.py',
+    'base_engine.py': 'src/engines/base.py',
+    'predictive_engine.py': 'src/engines/predictive.py',
+    'vector_engine.py': 'src/engines/vector.py'
+}
+
+# Word-level tokens (split on separators) that route code into src/ subdirs,
+# checked in priority order; anything else goes to src/core
+_TOKEN_SPLIT_RE = re.compile(r'[\\/_.\-\s]+')
+_MIGRATION_TOKENS = (
+    (frozenset({'agent', 'agents'}), 'agents'),
+    (frozenset({'engine', 'engines'}), 'engines'),
+    (frozenset({'model', 'models'}), 'models'),
+    (frozenset({'api', 'apis', 'route', 'routes', 'router'}), 'api'),
+)
+
+def _walk(root: Path) -> Iterator[Tuple[os.DirEntry, str]]:
+    """Yield (entry, lowercased suffix) for every file under root in one scandir pass"""
+    stack = [os.fspath(root)]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file():
+                    yield entry, os.path.splitext(entry.name)[1].lower()
+
+
+def _load_json(data: bytes) -> Any:
+    """Parse a JSON config; never falls back to YAML"""
+    return json.loads(data)
+
+
+def _load_yaml(data: bytes) -> Any:
+    """Parse a YAML config, trying the much faster JSON parser first"""
+    if data.lstrip()[:1] in (b'{', b'['):
+        try:
+            return json.loads(data)
+        except ValueError:
+            pass
+    return yaml.safe_load(data)
+
+
+_CONFIG_LOADERS = {
+    '.json': _load_json,
+    '.yaml': _load_yaml,
+    '.yml': _load_yaml,
+}
+
+
+def _link_or_copy(src: str, dst: str) -> str:
+    """Hard-link src to dst, falling back to a real copy across filesystems"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+    return dst
+
+
+def _fast_copy(src: Path, dst: Path) -> None:
+    """Copy src to dst inside the kernel via copy_file_range, falling back to copy2"""
+    try:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            remaining = os.fstat(fsrc.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+    except (AttributeError, OSError):
+        # No copy_file_range on this platform/filesystem pair
+        shutil.copy2(src, dst)
+        return
+    shutil.copystat(src, dst)
+
+
+def _migration_subdir(rel_lower: str) -> str:
+    """Pick the src/ subdirectory for a lowercased source-relative path"""
+    tokens = set(_TOKEN_SPLIT_RE.split(rel_lower))
+    for keywords, subdir in _MIGRATION_TOKENS:
+        if not tokens.isdisjoint(keywords):
+            return subdir
+    return 'core'
+
+
+@functools.lru_cache(maxsize=4096)
+def _categorize_path(path_lower: str) -> str:
+    """Map a lowercased path to its config category"""
+    found = {match.lastgroup for match in _CATEGORY_RE.finditer(path_lower)}
+    for category in _CATEGORY_PRIORITY:
+        if category in found:
+            return category
+    return 'general'
+
 
 class ProjectConsolidator:
     """Handles project consolidation and remapping"""
@@ -27,14 +158,29 @@ class ProjectConsolidator:
     def __init__(self, source_dir: str, target_dir: str):
         self.source_dir = Path(source_dir)
         self.target_dir = Path(target_dir)
-        self.backup_dir = Path(f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        # Single run timestamp shared by the backup name and the reports
+        self._started_at = datetime.now()
+        self.backup_dir = Path(f"backup_{self._started_at.strftime('%Y%m%d_%H%M%S')}")
         self.mapping_log = []
         self.errors = []
+        self._source_files = None
+
+    def _scan_source(self) -> Dict[str, List[Path]]:
+        """Classify source files by suffix, walking the tree only once"""
+        if self._source_files is None:
+            files = {'.py': [], '.yaml': [], '.yml': [], '.json': []}
+            for entry, suffix in _walk(self.source_dir):
+                bucket = files.get(suffix)
+                if bucket is not None:
+                    bucket.append(Path(entry.path))
+            self._source_files = files
+        return self._source_files
 
     def create_backup(self):
         """Create a backup of the source directory"""
         logger.info(f"Creating backup at {self.backup_dir}")
-        shutil.copytree(self.source_dir, self.backup_dir)
+        shutil.copytree(self.source_dir, self.backup_dir,
+                        copy_function=_link_or_copy, dirs_exist_ok=True)
 
     def create_new_structure(self):
         """Create the new project structure"""
@@ -53,39 +199,47 @@ class ProjectConsolidator:
         }
 
         logger.info("Creating new directory structure")
+        directories = []
+        files = []
         for parent, contents in structure.items():
             parent_path = self.target_dir / parent
-            parent_path.mkdir(parents=True, exist_ok=True)
+            directories.append(parent_path)
 
             if isinstance(contents, dict):
-                for subdir, files in contents.items():
+                for subdir, names in contents.items():
                     subdir_path = parent_path / subdir
-                    subdir_path.mkdir(exist_ok=True)
-                    for file in files:
-                        if file.endswith('.py'):
-                            self._create_python_file(subdir_path / file, subdir)
+                    directories.append(subdir_path)
+                    files.extend((subdir_path / name, subdir) for name in names if name.endswith('.py'))
             else:
-                for file in contents:
-                    if file.endswith('.py'):
-                        self._create_python_file(parent_path / file, parent)
-                    elif file.endswith('.md'):
-                        self._create_markdown_file(parent_path / file, parent)
-                    elif file.endswith('.yaml'):
-                        self._create_yaml_file(parent_path / file, parent)
-
-    def _create_python_file(self, filepath: Path, module_name: str):
-        """Create a Python file with proper header"""
-        if filepath.name == '__init__.py':
-            content = f'"""\n{module_name.capitalize()} module\n"""\n'
-        else:
-            content = f'"""\n{filepath.stem.capitalize()} module for {module_name}\n"""\n\n'
+                files.extend((parent_path / name, parent) for name in contents)
 
-        filepath.write_text(content)
+        renderers = {
+            '.py': self._python_file_content,
+            '.md': self._markdown_file_content,
+            '.yaml': self._yaml_file_content,
+        }
+        items = [
+            (filepath, renderers[filepath.suffix](filepath, section).encode())
+            for filepath, section in files
+            if filepath.suffix in renderers
+        ]
+
+        # One makedirs per unique directory, then one write per file
+        for directory in dict.fromkeys(directories):
+            os.makedirs(directory, exist_ok=True)
+        for filepath, content in items:
+            filepath.write_bytes(content)
+
+    def _python_file_content(self, filepath: Path, module_name: str) -> str:
+        """Render a Python file with proper header"""
+        if filepath.name == '__init__.py':
+            return f'"""\n{module_name.capitalize()} module\n"""\n'
+        return f'"""\n{filepath.stem.capitalize()} module for {module_name}\n"""\n\n'
 
-    def _create_markdown_file(self, filepath: Path, section: str):
-        """Create a markdown file"""
+    def _markdown_file_content(self, filepath: Path, section: str) -> str:
+        """Render a markdown file"""
         if filepath.name == 'README.md':
-            content = """# ncOS - Neural Compute Operating System
+            return """# ncOS - Neural Compute Operating System
 
 ## Overview
 Consolidated and remapped ncOS project structure.
@@ -97,29 +251,18 @@ Consolidated and remapped ncOS project structure.
 - `scripts/`: Utility scripts
 - `docs/`: Documentation
 """
-        else:
-            content = f"# {filepath.stem.replace('_', ' ').title()}\n\n"
+        return f"# {filepath.stem.replace('_', ' ').title()}\n\n"
 
-        filepath.write_text(content)
-
-    def _create_yaml_file(self, filepath: Path, section: str):
-        """Create a YAML configuration file"""
-        config = {
-            'version': '1.0',
-            'description': f'{filepath.stem} configuration',
-            'settings': {}
-        }
-
-        with open(filepath, 'w') as f:
-            yaml.dump(config, f, default_flow_style=False)
+    def _yaml_file_content(self, filepath: Path, section: str) -> str:
+        """Render a YAML configuration stub (same output as yaml.dump of the stub dict)"""
+        return f"description: {filepath.stem} configuration\nsettings: {{}}\nversion: '1.0'\n"
 
     def consolidate_configs(self):
         """Consolidate all configuration files"""
         logger.info("Consolidating configuration files")
 
-        config_files = list(self.source_dir.rglob('*.yaml')) + \
-                       list(self.source_dir.rglob('*.yml')) + \
-                       list(self.source_dir.rglob('*.json'))
+        source_files = self._scan_source()
+        config_files = source_files['.yaml'] + source_files['.yml'] + source_files['.json']
 
         consolidated = {
             'agents': {},
@@ -129,10 +272,13 @@ Consolidated and remapped ncOS project structure.
             'general': {}
         }
 
-        for config_file in config_files:
+        # Parse files concurrently, then update the buckets serially
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            loaded = list(executor.map(self._load_config, config_files))
+
+        for config_file, content in zip(config_files, loaded):
             try:
                 category = self._categorize_config(config_file)
-                content = self._load_config(config_file)
 
                 if content:
                     key = config_file.stem
@@ -161,28 +307,16 @@ Consolidated and remapped ncOS project structure.
 
     def _categorize_config(self, filepath: Path) -> str:
         """Categorize configuration file"""
-        path_str = str(filepath).lower()
-
-        if 'agent' in path_str:
-            return 'agents'
-        elif 'engine' in path_str:
-            return 'engines'
-        elif 'model' in path_str:
-            return 'models'
-        elif 'api' in path_str or 'route' in path_str:
-            return 'api'
-        else:
-            return 'general'
+        return _categorize_path(str(filepath).lower())
 
     def _load_config(self, filepath: Path) -> Dict[str, Any]:
         """Load configuration file"""
         try:
-            if filepath.suffix in ['.yaml', '.yml']:
-                with open(filepath, 'r') as f:
-                    return yaml.safe_load(f) or {}
-            elif filepath.suffix == '.json':
-                with open(filepath, 'r') as f:
-                    return json.load(f)
+            loader = _CONFIG_LOADERS.get(filepath.suffix)
+            if loader is None:
+                raise ValueError(f"unsupported config type '{filepath.suffix}'")
+            # Hand raw bytes to the parsers; they decode internally
+            return loader(filepath.read_bytes()) or {}
         except Exception as e:
             logger.warning(f"Failed to load {filepath}: {e}")
             return {}
@@ -191,47 +325,41 @@ Consolidated and remapped ncOS project structure.
         """Migrate and consolidate code files"""
         logger.info("Migrating code files")
 
-        # Define migration rules
-        migration_rules = {
-            'main.py': 'src/api/main.py',
-            'config.py': 'src/core/config.py',
-            'utils.py': 'src/core/utils.py',
-            'base_agent.py': 'src/agents/base.py',
-            'base_engine.py': 'src/engines/base.py',
-            'predictive_engine.py': 'src/engines/predictive.py',
-            'vector_engine.py': 'src/engines/vector.py'
-        }
+        # Resolve every fixed destination and fallback directory up front
+        rule_dests = {name: self.target_dir / dest for name, dest in _MIGRATION_RULES.items()}
+        src_dir = self.target_dir / 'src'
+        fallback_dirs = {subdir: src_dir / subdir for _, subdir in _MIGRATION_TOKENS}
+        fallback_dirs['core'] = src_dir / 'core'
+
+        # Walked paths all start with this prefix; categorize on the rest so
+        # the location of the source tree itself cannot skew the result
+        prefix_len = len(os.fspath(self.source_dir))
+        created_dirs = set()
 
         # Find and migrate Python files
-        for py_file in self.source_dir.rglob('*.py'):
+        for py_file in self._scan_source()['.py']:
             filename = py_file.name
+            path_str = str(py_file)
 
             # Skip __pycache__ and test files for now
-            if '__pycache__' in str(py_file) or 'test_' in filename:
+            if '__pycache__' in path_str or 'test_' in filename:
                 continue
 
-            # Determine destination
-            if filename in migration_rules:
-                dest = self.target_dir / migration_rules[filename]
-            else:
-                # Categorize based on path
-                if 'agent' in str(py_file).lower():
-                    dest = self.target_dir / 'src' / 'agents' / filename
-                elif 'engine' in str(py_file).lower():
-                    dest = self.target_dir / 'src' / 'engines' / filename
-                elif 'model' in str(py_file).lower():
-                    dest = self.target_dir / 'src' / 'models' / filename
-                elif 'api' in str(py_file).lower() or 'route' in str(py_file).lower():
-                    dest = self.target_dir / 'src' / 'api' / filename
-                else:
-                    dest = self.target_dir / 'src' / 'core' / filename
-
-            # Copy file
-            dest.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(py_file, dest)
+            # Determine destination: fixed rule first, else categorize based
+            # on whole words in the relative path
+            dest = rule_dests.get(filename)
+            if dest is None:
+                subdir = _migration_subdir(path_str[prefix_len:].lower())
+                dest = fallback_dirs[subdir] / filename
+
+            # Copy file (a real copy, not a link: the migrated tree gets edited)
+            if dest.parent not in created_dirs:
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                created_dirs.add(dest.parent)
+            _fast_copy(py_file, dest)
 
             self.mapping_log.append({
-                'source': str(py_file),
+                'source': path_str,
                 'destination': str(dest),
                 'status': 'migrated'
             })
@@ -291,56 +419,50 @@ Consolidated and remapped ncOS project structure.
         """Generate consolidation reports"""
         logger.info("Generating reports")
 
-        # Mapping report
-        mapping_report = {
-            'timestamp': datetime.now().isoformat(),
+        # Mapping report, streamed one mapping per line so the full
+        # document is never materialized in memory
+        header = {
+            'timestamp': self._started_at.isoformat(),
             'source_directory': str(self.source_dir),
             'target_directory': str(self.target_dir),
             'files_processed': len(self.mapping_log),
             'errors': len(self.errors),
-            'mappings': self.mapping_log,
-            'errors_detail': self.errors
         }
 
         report_file = self.target_dir / 'consolidation_report.json'
         with open(report_file, 'w') as f:
-            json.dump(mapping_report, f, indent=2)
-
-        # Summary report
-        summary = f"""# ncOS Consolidation Summary
-
-## Overview
-- **Date**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-- **Files Processed**: {len(self.mapping_log)}
-- **Errors**: {len(self.errors)}
-
-## New Structure
-```
-{self.target_dir}/
-├── src/
-│   ├── core/       # Core system components
-│   ├── engines/    # Engine implementations
-│   ├── agents/     # Agent implementations
-│   ├── api/        # API layer
-│   └── models/     # Data models
-├── config/         # Consolidated configurations
-├── tests/          # Test suite
-├── scripts/        # Utility scripts
-└── docs/           # Documentation
-```
-
-## Next Steps
-1. Review the consolidation report
-2. Update import statements in Python files
-3. Run tests to ensure functionality
-4. Update documentation
-"""
-
+            f.write(json.dumps(header)[:-1])
+            f.write(', "mappings": [')
+            separator = '\n'
+            for entry in self.mapping_log:
+                f.write(separator)
+                f.write(json.dumps(entry))
+                separator = ',\n'
+            f.write('\n], "errors_detail": ')
+            f.write(json.dumps(self.errors))
+            f.write('}\n')
+
+        # Summary report, written line by line
         summary_file = self.target_dir / 'CONSOLIDATION_SUMMARY.md'
-        summary_file.write_text(summary)
+        with open(summary_file, 'w') as f:
+            f.writelines(self._summary_lines())
 
         logger.info(f"Reports generated: {report_file}, {summary_file}")
 
+    def _summary_lines(self) -> Iterator[str]:
+        """Yield the consolidation summary Markdown one line at a time"""
+        yield '# ncOS Consolidation Summary\n'
+        yield '\n'
+        yield '## Overview\n'
+        yield f"- **Date**: {self._started_at.strftime('%Y-%m-%d %H:%M:%S')}\n"
+        yield f'- **Files Processed**: {len(self.mapping_log)}\n'
+        yield f'- **Errors**: {len(self.errors)}\n'
+        yield '\n'
+        yield '## New Structure\n'
+        yield '```\n'
+        yield f'{self.target_dir}/\n'
+        yield from _SUMMARY_TAIL
+
     def run(self):
         """Run the complete consolidation process"""
         logger.info("Starting ncOS consolidation and remapping")
@@ -4,23 +4,105 @@ ncOS Configuration Consolidator
 Consolidates 82 config files into a unified hierarchical structure
 """
 
+import functools
 import json
+import os
+import re
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
 import yaml
 
+# Config loading is I/O bound, so oversubscribe the CPUs
+MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Parsed-config cache keyed by path, validated by (mtime_ns, size)
+CACHE_FILE_NAME = '.consolidation_cache.json'
+
+
+def _walk(root):
+    """Yield (entry, lowercased suffix) for every file under root in one scandir pass"""
+    stack = [os.fspath(root)]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file():
+                    yield entry, os.path.splitext(entry.name)[1].lower()
+
+
+_MISSING = object()
+
+
+def _freeze(item):
+    """Return a hashable equivalent of a parsed YAML/JSON value"""
+    kind = type(item)
+    if kind is dict:
+        return frozenset((key, _freeze(value)) for key, value in item.items())
+    if kind is list:
+        return tuple(_freeze(value) for value in item)
+    return item
+
+
+def _extend_unique(existing, items):
+    """Append items not already present in existing, in O(len(existing) + len(items))"""
+    seen = set(map(_freeze, existing))
+    for item in items:
+        frozen = _freeze(item)
+        if frozen not in seen:
+            seen.add(frozen)
+            existing.append(item)
+
+
+def _link_or_copy(src, dst):
+    """Hard-link src to dst, falling back to a real copy across filesystems"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+    return dst
+
+
+# Zero-width alternation so overlapping keywords are all reported in one scan
+_CATEGORY_RE = re.compile(
+    r'(?=(?P<agents>agent)'
+    r'|(?P<strategies>strategy|trigger|trade|smc|wyckoff)'
+    r'|(?P<system>system|core|main|global)'
+    r'|(?P<api>api|endpoint|route)'
+    r'|(?P<journal>journal|log|session)'
+    r'|(?P<monitoring>monitor|metric|alert)'
+    r'|(?P<integrations>integration|external|finnhub|market))'
+)
+_CATEGORY_PRIORITY = ('agents', 'strategies', 'system', 'api', 'journal', 'monitoring', 'integrations')
+
+
+@functools.lru_cache(maxsize=4096)
+def _categorize_name(file_lower):
+    """Categorize a lowercased config name, or None if the name gives no hint"""
+    found = {match.lastgroup for match in _CATEGORY_RE.finditer(file_lower)}
+    for category in _CATEGORY_PRIORITY:
+        if category in found:
+            return category
+    return None
+
 
 class ConfigConsolidator:
     def __init__(self, project_root="ncOS_v21.7"):
         self.project_root = Path(project_root)
         self.config_dir = self.project_root / "config"
-        self.backup_dir = Path(f"config_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        self.cache_file = self.project_root / CACHE_FILE_NAME
+        self._parse_cache = {}
+        self._next_cache = {}
+        # Single run timestamp shared by the backup name and the metadata
+        self._started_at = datetime.now()
+        self.backup_dir = Path(f"config_backup_{self._started_at.strftime('%Y%m%d_%H%M%S')}")
         self.consolidated_config = {
             'version': '21.7',
             'meta': {
-                'created': datetime.now().isoformat(),
+                'created': self._started_at.isoformat(),
                 'original_files': 0,
                 'consolidated_from': []
             },
@@ -38,117 +120,166 @@ class ConfigConsolidator:
         print("📦 Creating configuration backup...")
 
         if self.config_dir.exists():
-            shutil.copytree(self.config_dir, self.backup_dir)
+            shutil.copytree(self.config_dir, self.backup_dir,
+                            copy_function=_link_or_copy, dirs_exist_ok=True)
             print(f"✅ Backup created: {self.backup_dir}")
 
         # Also backup any .yaml/.yml files in root
         for pattern in ['*.yaml', '*.yml']:
             for config_file in self.project_root.glob(pattern):
                 backup_path = self.backup_dir / config_file.name
-                shutil.copy2(config_file, backup_path)
+                _link_or_copy(config_file, backup_path)
 
     def categorize_config(self, file_name, content):
         """Categorize configuration based on filename and content"""
-        file_lower = file_name.lower()
-
-        # Categorization rules
-        if 'agent' in file_lower:
-            return 'agents'
-        elif any(x in file_lower for x in ['strategy', 'trigger', 'trade', 'smc', 'wyckoff']):
-            return 'strategies'
-        elif any(x in file_lower for x in ['system', 'core', 'main', 'global']):
-            return 'system'
-        elif any(x in file_lower for x in ['api', 'endpoint', 'route']):
-            return 'api'
-        elif any(x in file_lower for x in ['journal', 'log', 'session']):
-            return 'journal'
-        elif any(x in file_lower for x in ['monitor', 'metric', 'alert']):
-            return 'monitoring'
-        elif any(x in file_lower for x in ['integration', 'external', 'finnhub', 'market']):
-            return 'integrations'
-        else:
-            # Check content for hints
-            if isinstance(content, dict):
-                keys = ' '.join(content.keys()).lower()
-                if 'agent' in keys:
-                    return 'agents'
-                elif 'strategy' in keys or 'trade' in keys:
-                    return 'strategies'
-            return 'system'  # Default
+        # Categorization rules (filename based, memoized)
+        category = _categorize_name(file_name.lower())
+        if category is not None:
+            return category
+
+        # Check content for hints
+        if isinstance(content, dict):
+            keys = ' '.join(content.keys()).lower()
+            if 'agent' in keys:
+                return 'agents'
+            elif 'strategy' in keys or 'trade' in keys:
+                return 'strategies'
+        return 'system'  # Default
 
     def merge_config(self, category, name, content):
         """Merge configuration into consolidated structure"""
+        bucket = self.consolidated_config[category]
         if isinstance(content, dict):
-            if name not in self.consolidated_config[category]:
-                self.consolidated_config[category][name] = content
+            if name not in bucket:
+                bucket[name] = content
             else:
                 # Deep merge
-                self.deep_merge(self.consolidated_config[category][name], content)
+                self.deep_merge(bucket[name], content)
         elif isinstance(content, list):
-            if name not in self.consolidated_config[category]:
-                self.consolidated_config[category][name] = content
+            if name not in bucket:
+                bucket[name] = content
             else:
                 # Extend list, avoiding duplicates
-                existing = self.consolidated_config[category][name]
+                existing = bucket[name]
                 if isinstance(existing, list):
-                    for item in content:
-                        if item not in existing:
-                            existing.append(item)
+                    _extend_unique(existing, content)
 
     def deep_merge(self, base, update):
         """Deep merge two dictionaries"""
-        for key, value in update.items():
-            if key in base:
-                if isinstance(base[key], dict) and isinstance(value, dict):
-                    self.deep_merge(base[key], value)
-                elif isinstance(base[key], list) and isinstance(value, list):
-                    for item in value:
-                        if item not in base[key]:
-                            base[key].append(item)
+        # Explicit stack instead of recursion, one frame per nested dict pair
+        stack = [(base, update)]
+        while stack:
+            target, source = stack.pop()
+            for key, value in source.items():
+                current = target.get(key, _MISSING)
+                # Parsed YAML/JSON only yields plain dicts and lists, so exact
+                # type identity is enough and cheaper than isinstance
+                kind = type(current)
+                if kind is dict and type(value) is dict:
+                    stack.append((current, value))
+                elif kind is list and type(value) is list:
+                    _extend_unique(current, value)
                 else:
-                    base[key] = value
-            else:
-                base[key] = value
+                    target[key] = value
+
+    def load_config_file(self, config_file):
+        """Load a single YAML/JSON configuration file"""
+        # Hand raw bytes to the parsers; they decode internally
+        if config_file.suffix in ['.yaml', '.yml']:
+            return yaml.safe_load(config_file.read_bytes())
+        elif config_file.suffix == '.json':
+            return json.loads(config_file.read_bytes())
+        return None
+
+    def load_parse_cache(self):
+        """Load the parse cache written by the previous run, if any"""
+        try:
+            cache = json.loads(self.cache_file.read_bytes())
+        except (OSError, ValueError):
+            return {}
+        return cache if isinstance(cache, dict) else {}
+
+    def save_parse_cache(self):
+        """Persist parses of the files seen in this run"""
+        try:
+            self.cache_file.write_text(json.dumps(self._next_cache))
+        except OSError as e:
+            print(f"  ⚠️ Could not write parse cache {self.cache_file}: {e}")
+
+    def load_config_cached(self, config_file):
+        """Load a config file, reusing the cached parse when it is unchanged"""
+        key = str(config_file)
+        stat = config_file.stat()
+        entry = self._parse_cache.get(key)
+        if entry and entry.get('mtime_ns') == stat.st_mtime_ns and entry.get('size') == stat.st_size:
+            self._next_cache[key] = entry
+            return entry['content']
+
+        content = self.load_config_file(config_file)
+
+        # Only cache content that survives a JSON round trip unchanged
+        # (YAML dates or non-string keys would not)
+        try:
+            cacheable = json.loads(json.dumps(content)) == content
+        except (TypeError, ValueError):
+            cacheable = False
+        if cacheable:
+            self._next_cache[key] = {
+                'mtime_ns': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'content': content,
+            }
+        return content
 
     def process_configs(self):
         """Process all configuration files"""
         print("\n🔍 Scanning for configuration files...")
 
-        config_files = []
+        yaml_files = []
+        json_files = []
 
-        # Find all YAML/YML files
-        for pattern in ['**/*.yaml', '**/*.yml']:
-            config_files.extend(self.project_root.glob(pattern))
+        # Single walk: all YAML/YML files plus JSON files that look like config
+        for entry, suffix in _walk(self.project_root):
+            if suffix in ('.yaml', '.yml'):
+                yaml_files.append(Path(entry.path))
+            elif suffix == '.json':
+                json_file = Path(entry.path)
+                if 'config' in entry.name.lower() or json_file.parent.name == 'config':
+                    json_files.append(json_file)
 
-        # Find all JSON config files
-        for json_file in self.project_root.glob('**/*.json'):
-            if 'config' in json_file.name.lower() or json_file.parent.name == 'config':
-                config_files.append(json_file)
+        config_files = yaml_files + json_files
 
         print(f"Found {len(config_files)} configuration files")
 
+        # Load files concurrently, then merge serially in discovery order
+        self._parse_cache = self.load_parse_cache()
+        self._next_cache = {}
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            futures = [executor.submit(self.load_config_cached, f) for f in config_files]
+
+        # Save before merging, which mutates the parsed objects in place
+        self.save_parse_cache()
+
+        # Hoisted out of the loop below
+        consolidated_from = self.consolidated_config['meta']['consolidated_from']
+        categorize = self.categorize_config
+        merge = self.merge_config
+
         # Process each file
-        for config_file in config_files:
+        for config_file, future in zip(config_files, futures):
             relative_path = config_file.relative_to(self.project_root)
 
             try:
-                # Load configuration
-                if config_file.suffix in ['.yaml', '.yml']:
-                    with open(config_file, 'r') as f:
-                        content = yaml.safe_load(f)
-                elif config_file.suffix == '.json':
-                    with open(config_file, 'r') as f:
-                        content = json.load(f)
-                else:
-                    continue
+                content = future.result()
 
                 if content:
                     # Categorize and merge
-                    category = self.categorize_config(config_file.stem, content)
-                    self.merge_config(category, config_file.stem, content)
+                    name = config_file.stem
+                    category = categorize(name, content)
+                    merge(category, name, content)
 
                     # Track source
-                    self.consolidated_config['meta']['consolidated_from'].append(str(relative_path))
+                    consolidated_from.append(str(relative_path))
 
                     print(f"  ✅ Processed: {relative_path} → {category}")
 
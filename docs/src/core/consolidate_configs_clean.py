@@ -1,34 +1,121 @@
 #!/usr/bin/env python3
 import json
+import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
 import yaml
 
+# libyaml-backed loader/dumper when PyYAML was built with it
+CLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+CDumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+# Config I/O is disk bound, so oversubscribe the CPUs
+MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Directories pruned from the scan (plus any with 'backup' in the name)
+SKIP_DIR_NAMES = frozenset({'node_modules', '__pycache__', '.git', 'venv'})
+
+# Config extensions, in the order their files are listed
+CONFIG_EXTENSIONS = {'.json': 0, '.yaml': 1, '.yml': 2, '.conf': 3, '.cfg': 4, '.ini': 5}
+
+
+def _skip_dir(name):
+    """True for directories that never hold project configuration"""
+    return name in SKIP_DIR_NAMES or 'backup' in name
+
+
+def _walk(root):
+    """Yield every non-directory entry under root once, pruning skipped dirs
+
+    Entries come out in pre-order (a directory's files, then each
+    subdirectory in turn), the same order rglob produces.
+    """
+    stack = [os.fspath(root)]
+    while stack:
+        subdirs = []
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if not _skip_dir(entry.name):
+                        subdirs.append(entry.path)
+                else:
+                    yield entry
+        stack.extend(reversed(subdirs))
+
+
+def _fast_copy(src, dst):
+    """Copy src to dst inside the kernel via copy_file_range, falling back to copy2"""
+    try:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            remaining = os.fstat(fsrc.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+    except (AttributeError, OSError):
+        # No copy_file_range on this platform/filesystem pair
+        shutil.copy2(src, dst)
+        return
+    shutil.copystat(src, dst)
+
+
+# The trees written out are built here and acyclic, so skip the cycle check
+_JSON_ENCODER = json.JSONEncoder(indent=2, check_circular=False)
+
+
+def _dump_json(obj, f):
+    """Write obj to the text file f as indented JSON, chunk by chunk"""
+    f.writelines(_JSON_ENCODER.iterencode(obj))
+
+
+def _root_prefix_len(root):
+    """Length of the prefix to slice off str(path) for paths found under root"""
+    root = os.fspath(root)
+    # Path('./x') normalizes to 'x', so files under '.' carry no prefix
+    return 0 if root == '.' else len(root.rstrip(os.sep)) + 1
+
+
+def _try_json_first(text):
+    """Parse text as JSON if it looks like a JSON document, else return None"""
+    if text.lstrip()[:1] not in ('{', '['):
+        return None
+    try:
+        return json.loads(text)
+    except ValueError:
+        return None
+
 
 class ConfigurationConsolidator:
     def __init__(self, project_root: str):
         self.project_root = Path(project_root)
+        self._root_prefix_len = _root_prefix_len(self.project_root)
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         self.backup_dir = self.project_root / f"config_backup_{timestamp}"
         self.consolidated_config = {}
         self.config_files = []
         self.agent_configs = {}
+        # Parsed content of every scanned file, filled by analyze_configs
+        self._parsed = {}
 
     def scan_config_files(self):
-        config_patterns = ['*.json', '*.yaml', '*.yml', '*.conf', '*.cfg', '*.ini']
-        config_files = []
-
-        for pattern in config_patterns:
-            config_files.extend(self.project_root.rglob(pattern))
-
+        # One walk of the tree, bucketed by extension to keep the per-type order
+        buckets = [[] for _ in CONFIG_EXTENSIONS]
+        for entry in _walk(self.project_root):
+            index = CONFIG_EXTENSIONS.get(os.path.splitext(entry.name)[1])
+            if index is not None:
+                buckets[index].append(Path(entry.path))
+
+        skip_dirs = ['node_modules', '__pycache__', '.git', 'venv', 'backup']
         filtered_files = []
-        for file in config_files:
-            skip_dirs = ['node_modules', '__pycache__', '.git', 'venv', 'backup']
-            if any(skip in str(file) for skip in skip_dirs):
-                continue
-            filtered_files.append(file)
+        for bucket in buckets:
+            for file in bucket:
+                if any(skip in str(file) for skip in skip_dirs):
+                    continue
+                filtered_files.append(file)
 
         self.config_files = filtered_files
         return filtered_files
@@ -37,22 +124,40 @@ class ConfigurationConsolidator:
         print(f"Creating backup in {self.backup_dir}")
         self.backup_dir.mkdir(exist_ok=True)
 
-        for config_file in self.config_files:
+        # Copies run concurrently; errors are reported in file order
+        created_dirs = set()
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            futures = [executor.submit(self._backup_file, f, created_dirs)
+                       for f in self.config_files]
+        for config_file, future in zip(self.config_files, futures):
             try:
-                relative_path = config_file.relative_to(self.project_root)
-                backup_path = self.backup_dir / relative_path
-                backup_path.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(config_file, backup_path)
+                future.result()
             except Exception as e:
                 print(f"Error backing up {config_file}: {e}")
 
+    def _backup_file(self, config_file, created_dirs):
+        relative_path = str(config_file)[self._root_prefix_len:]
+        backup_path = self.backup_dir / relative_path
+        # Each parent is created once; a directory is only added to
+        # created_dirs after it exists, so a racing miss is just a no-op mkdir
+        parent = backup_path.parent
+        if parent not in created_dirs:
+            parent.mkdir(parents=True, exist_ok=True)
+            created_dirs.add(parent)
+        _fast_copy(config_file, backup_path)
+
     def load_config_file(self, file_path):
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 if file_path.suffix == '.json':
                     return json.load(f)
                 elif file_path.suffix in ['.yaml', '.yml']:
-                    return yaml.safe_load(f) or {}
+                    # JSON is a YAML subset and far cheaper to parse
+                    text = f.read()
+                    data = _try_json_first(text)
+                    if data is None:
+                        data = yaml.load(text, Loader=CLoader)
+                    return data or {}
                 elif file_path.suffix in ['.ini', '.cfg', '.conf']:
                     config = {}
                     current_section = 'default'
@@ -83,16 +188,22 @@ class ConfigurationConsolidator:
                 config_by_dir[dir_path] = []
             config_by_dir[dir_path].append(config_file)
 
-        for dir_path, files in config_by_dir.items():
-            if 'agents' in str(dir_path):
-                agent_name = dir_path.name
-                self.agent_configs[agent_name] = {
-                    'files': files,
-                    'configs': {}
-                }
-                for file in files:
-                    config = self.load_config_file(file)
-                    self.agent_configs[agent_name]['configs'][file.name] = config
+        agent_dirs = [(dir_path, files) for dir_path, files in config_by_dir.items()
+                      if 'agents' in str(dir_path)]
+
+        # Parse every file once, concurrently; consolidate reuses the results
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            self._parsed = dict(zip(self.config_files,
+                                    executor.map(self.load_config_file, self.config_files)))
+
+        for dir_path, files in agent_dirs:
+            agent_name = dir_path.name
+            self.agent_configs[agent_name] = {
+                'files': files,
+                'configs': {}
+            }
+            for file in files:
+                self.agent_configs[agent_name]['configs'][file.name] = self._parsed[file]
 
     def consolidate(self):
         print("Consolidating configurations...")
@@ -114,21 +225,26 @@ class ConfigurationConsolidator:
         }
 
         for agent_name, agent_data in self.agent_configs.items():
+            # Fold into one fresh dict; later files win on overlapping keys
+            settings = {}
+            for config in agent_data['configs'].values():
+                if isinstance(config, dict):
+                    settings.update(config)
+
             agent_config = {
                 'enabled': True,
-                'config_files': [str(f.relative_to(self.project_root)) for f in agent_data['files']],
-                'settings': {}
+                'config_files': [str(f)[self._root_prefix_len:] for f in agent_data['files']],
+                'settings': settings
             }
 
-            for file_name, config in agent_data['configs'].items():
-                if isinstance(config, dict):
-                    agent_config['settings'].update(config)
-
             self.consolidated_config['agents'][agent_name] = agent_config
 
         for config_file in self.config_files:
             if 'agents' not in str(config_file):
-                config = self.load_config_file(config_file)
+                if config_file in self._parsed:
+                    config = self._parsed[config_file]
+                else:
+                    config = self.load_config_file(config_file)
                 self._merge_config(config, config_file)
 
     def _merge_config(self, config, file_path):
@@ -143,10 +259,8 @@ class ConfigurationConsolidator:
         elif 'security' in file_name or 'auth' in file_name:
             self.consolidated_config['security'].update(config)
         else:
-            service_name = file_path.parent.name
-            if service_name not in self.consolidated_config['services']:
-                self.consolidated_config['services'][service_name] = {}
-            self.consolidated_config['services'][service_name].update(config)
+            services = self.consolidated_config['services']
+            services.setdefault(file_path.parent.name, {}).update(config)
 
     def save_consolidated_config(self):
         config_dir = self.project_root / 'config'
@@ -154,13 +268,13 @@ class ConfigurationConsolidator:
 
         config_path = config_dir / 'consolidated_config.json'
         with open(config_path, 'w') as f:
-            json.dump(self.consolidated_config, f, indent=2)
+            _dump_json(self.consolidated_config, f)
 
         print(f"Consolidated configuration saved to: {config_path}")
 
         yaml_path = config_dir / 'consolidated_config.yaml'
         with open(yaml_path, 'w') as f:
-            yaml.dump(self.consolidated_config, f, default_flow_style=False)
+            yaml.dump(self.consolidated_config, f, Dumper=CDumper, default_flow_style=False)
 
         print(f"YAML version saved to: {yaml_path}")
 
@@ -168,12 +282,30 @@ class ConfigurationConsolidator:
         loader_code = '''#!/usr/bin/env python3
 import json
 import os
+import sys
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_MISSING = object()
+
+
+def _read_json(path: Path) -> Any:
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
 class ConfigLoader:
     _instance = None
     _config = None
+    # key_path -> tuple of interned keys, so get() splits each path only once
+    _path_cache: Dict[str, tuple] = {}
 
     def __new__(cls):
         if cls._instance is None:
@@ -187,31 +319,37 @@ class ConfigLoader:
     def load_config(self):
         config_path = Path(__file__).parent / 'config' / 'consolidated_config.json'
 
-        with open(config_path, 'r') as f:
-            self._config = json.load(f)
+        self._config = _read_json(config_path)
 
         env = os.getenv('NCOS_ENV', 'production')
         env_config_path = config_path.parent / f'config.{env}.json'
         if env_config_path.exists():
-            with open(env_config_path, 'r') as f:
-                env_config = json.load(f)
-                self._merge_configs(self._config, env_config)
+            env_config = _read_json(env_config_path)
+            self._merge_configs(self._config, env_config)
 
     def _merge_configs(self, base: Dict, override: Dict):
-        for key, value in override.items():
-            if key in base and isinstance(base[key], dict) and isinstance(value, dict):
-                self._merge_configs(base[key], value)
-            else:
-                base[key] = value
+        stack = [(base, override)]
+        while stack:
+            target, source = stack.pop()
+            for key, value in source.items():
+                current = target.get(key)
+                if type(current) is dict and type(value) is dict:
+                    stack.append((current, value))
+                else:
+                    target[key] = value
 
     def get(self, key_path: str, default: Any = None) -> Any:
-        keys = key_path.split('.')
-        value = self._config
+        keys = self._path_cache.get(key_path)
+        if keys is None:
+            keys = tuple(sys.intern(key) for key in key_path.split('.'))
+            self._path_cache[key_path] = keys
 
+        value = self._config
         for key in keys:
-            if isinstance(value, dict) and key in value:
-                value = value[key]
-            else:
+            if type(value) is not dict:
+                return default
+            value = value.get(key, _MISSING)
+            if value is _MISSING:
                 return default
 
         return value
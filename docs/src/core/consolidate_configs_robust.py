@@ -4,19 +4,207 @@ Robust Configuration Consolidator for ncOS
 Handles YAML errors gracefully and provides better error reporting
 """
 
+import ast
 import json
+import mmap
+import os
 import re
 import shutil
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
 import yaml
 
+# libyaml-backed loader when PyYAML was built with it
+CLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# Config I/O is disk bound, so oversubscribe the CPUs
+MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Directories pruned from the scan (plus any with 'backup' in the name
+# and *.egg-info); only what skip_patterns would reject file by file
+SKIP_DIR_NAMES = frozenset({'__pycache__', '.git'})
+
+# Config file extensions, in the order their files are listed; the
+# Python config names come after them
+CONFIG_EXTENSIONS = {
+    '.yaml': 0, '.yml': 1, '.json': 2, '.toml': 3, '.ini': 4, '.conf': 5, '.config': 6,
+}
+PY_CONFIG_NAMES = {'settings.py': 8, 'configuration.py': 9}
+
+_MISSING = object()
+
+
+def _freeze(item):
+    """Return a hashable equivalent of a parsed config value"""
+    kind = type(item)
+    if kind is dict:
+        return frozenset((key, _freeze(value)) for key, value in item.items())
+    if kind is list:
+        return tuple(_freeze(value) for value in item)
+    return item
+
+
+def _is_json_value(value):
+    """True if value round-trips through JSON as-is (no sets, bytes, tuples, ...)"""
+    kind = type(value)
+    if value is None or kind in (str, int, float, bool):
+        return True
+    if kind is list:
+        return all(_is_json_value(item) for item in value)
+    if kind is dict:
+        return all(type(key) is str and _is_json_value(item) for key, item in value.items())
+    return False
+
+
+# An unescaped metacharacter, or an escape that is a class or anchor
+# (\d, \b, ...) or a backslash itself, makes a skip pattern a real regex
+_REGEX_META = re.compile(r'(?<!\\)[.^$*+?{}\[\]|()]|\\[0-9A-Za-z\\]')
+_ESCAPE = re.compile(r'\\(.)')
+
+
+def _split_skip_patterns(patterns):
+    """Split skip regexes into plain substrings and one regex for the rest
+
+    A pattern with no unescaped metacharacter just looks for its unescaped
+    text, which a substring test does far more cheaply than re.search.
+    """
+    literals = []
+    regexes = []
+    for pattern in patterns:
+        if _REGEX_META.search(pattern):
+            regexes.append(pattern)
+        else:
+            literals.append(_ESCAPE.sub(r'\1', pattern))
+    return tuple(literals), re.compile('|'.join(regexes)) if regexes else None
+
+
+def _skip_dir(name):
+    """True for directories that never hold project configuration"""
+    return name in SKIP_DIR_NAMES or 'backup' in name or name.endswith('.egg-info')
+
+
+def _walk(root):
+    """Yield every non-directory entry under root once, pruning skipped dirs
+
+    Entries come out in pre-order (a directory's files, then each
+    subdirectory in turn), the same order rglob produces.
+    """
+    stack = [os.fspath(root)]
+    while stack:
+        subdirs = []
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if not _skip_dir(entry.name):
+                        subdirs.append(entry.path)
+                else:
+                    yield entry
+        stack.extend(reversed(subdirs))
+
+
+def _root_prefix_len(root):
+    """Length of the prefix to slice off str(path) for paths found under root"""
+    root = os.fspath(root)
+    # Path('./x') normalizes to 'x', so files under '.' carry no prefix
+    return 0 if root == '.' else len(root.rstrip(os.sep)) + 1
+
+
+def _fast_copy(src, dst):
+    """Copy src to dst inside the kernel via copy_file_range, falling back to copy2"""
+    try:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            remaining = os.fstat(fsrc.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+    except (AttributeError, OSError):
+        # No copy_file_range on this platform/filesystem pair
+        shutil.copy2(src, dst)
+        return
+    shutil.copystat(src, dst)
+
+
+# Keeps the cycle check: YAML anchors can make a parsed config refer to
+# itself, which must fail with ValueError rather than recurse to the limit
+_JSON_ENCODER = json.JSONEncoder(indent=2)
+
+
+def _dump_json(obj, f):
+    """Write obj to the text file f as indented JSON, chunk by chunk"""
+    f.writelines(_JSON_ENCODER.iterencode(obj))
+
+
+# One scan finds every category keyword in a path; overlapping hits are
+# resolved by _CATEGORY_PRIORITY, the order the checks used to run in
+_CATEGORY_RE = re.compile(
+    r'(?=(?P<agents>agent)'
+    r'|(?P<database>database|db)'
+    r'|(?P<api>api|endpoint)'
+    r'|(?P<models>model)'
+    r'|(?P<engines>engine)'
+    r'|(?P<services>service)'
+    r'|(?P<testing>test))'
+)
+_CATEGORY_PRIORITY = ('agents', 'database', 'api', 'models', 'engines', 'services', 'testing')
+
+
+def _categorize_path(path_lower):
+    """Categorize a lowercased path, or None if the path gives no hint"""
+    found = {match.lastgroup for match in _CATEGORY_RE.finditer(path_lower)}
+    for category in _CATEGORY_PRIORITY:
+        if category in found:
+            return category
+    return None
+
+
+class _LenientLoader(yaml.SafeLoader):
+    """SafeLoader that reads aliases to undefined anchors as null"""
+
+    def compose_node(self, parent, index):
+        if self.check_event(yaml.AliasEvent):
+            event = self.peek_event()
+            if event.anchor not in self.anchors:
+                self.get_event()
+                return yaml.ScalarNode('tag:yaml.org,2002:null', 'null',
+                                       event.start_mark, event.end_mark)
+        return super().compose_node(parent, index)
+
+
+# Files larger than this are mmap'ed (and prefaulted where supported)
+# instead of read through buffered I/O
+MMAP_THRESHOLD = 64 * 1024
+
+
+def _read_bytes(file_path):
+    """Read a whole file as bytes, mapping large files into memory"""
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size <= MMAP_THRESHOLD or not hasattr(mmap, 'MAP_PRIVATE'):
+            return f.read()
+        flags = mmap.MAP_PRIVATE | getattr(mmap, 'MAP_POPULATE', 0)
+        with mmap.mmap(f.fileno(), size, flags=flags, prot=mmap.PROT_READ) as mm:
+            return mm[:]
+
+
+def _try_json_first(text):
+    """Parse text (str or bytes) as JSON if it looks like a JSON document, else return None"""
+    if text.lstrip()[:1] not in ('{', '[', b'{', b'['):
+        return None
+    try:
+        return json.loads(text)
+    except ValueError:
+        return None
+
 
 class RobustConfigConsolidator:
     def __init__(self, root_dir="."):
         self.root_dir = Path(root_dir)
+        self._root_prefix_len = _root_prefix_len(self.root_dir)
         self.config_files = []
         self.consolidated_config = defaultdict(dict)
         self.errors = []
@@ -30,19 +218,32 @@ class RobustConfigConsolidator:
             r'backup',
             r'\.DS_Store'
         ]
+        self._skip_literals, self._skip_re = _split_skip_patterns(self.skip_patterns)
 
     def find_config_files(self):
         """Find all configuration files"""
         print("Scanning for configuration files...")
-        config_patterns = [
-            "*.yaml", "*.yml", "*.json", "*.toml", "*.ini", "*.conf", "*.config",
-            "*config.py", "settings.py", "configuration.py"
-        ]
 
-        for pattern in config_patterns:
-            for file_path in self.root_dir.rglob(pattern):
+        # One walk of the tree, bucketed to keep the per-pattern order
+        buckets = [[] for _ in range(10)]
+        for entry in _walk(self.root_dir):
+            name = entry.name
+            index = CONFIG_EXTENSIONS.get(os.path.splitext(name)[1])
+            if index is None:
+                if name.endswith('config.py'):
+                    index = 7
+                else:
+                    index = PY_CONFIG_NAMES.get(name)
+                    if index is None:
+                        continue
+            buckets[index].append(Path(entry.path))
+
+        for bucket in buckets:
+            for file_path in bucket:
                 # Skip files matching skip patterns
-                if any(re.search(skip, str(file_path)) for skip in self.skip_patterns):
+                path_str = str(file_path)
+                if any(lit in path_str for lit in self._skip_literals) or (
+                        self._skip_re is not None and self._skip_re.search(path_str)):
                     continue
                 self.config_files.append(file_path)
 
@@ -56,12 +257,14 @@ class RobustConfigConsolidator:
 
         print(f"Creating backup in {backup_dir}")
 
-        for config_file in self.config_files:
+        # Copies run concurrently; warnings are recorded in file order
+        created_dirs = set()
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            futures = [executor.submit(self._backup_file, f, backup_dir, created_dirs)
+                       for f in self.config_files]
+        for config_file, future in zip(self.config_files, futures):
             try:
-                relative_path = config_file.relative_to(self.root_dir)
-                backup_path = backup_dir / relative_path
-                backup_path.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(config_file, backup_path)
+                future.result()
             except Exception as e:
                 self.warnings.append(f"Could not backup {config_file}: {e}")
 
@@ -72,22 +275,37 @@ class RobustConfigConsolidator:
             'warnings': self.warnings
         }
         with open(backup_dir / 'backup_metadata.json', 'w') as f:
-            json.dump(metadata, f, indent=2)
+            _dump_json(metadata, f)
+
+    def _backup_file(self, config_file, backup_dir, created_dirs):
+        """Copy one config file into backup_dir, keeping its relative path"""
+        relative_path = str(config_file)[self._root_prefix_len:]
+        backup_path = backup_dir / relative_path
+        # Each parent is created once; a directory is only added to
+        # created_dirs after it exists, so a racing miss is just a no-op mkdir
+        parent = backup_path.parent
+        if parent not in created_dirs:
+            parent.mkdir(parents=True, exist_ok=True)
+            created_dirs.add(parent)
+        _fast_copy(config_file, backup_path)
 
     def safe_load_yaml(self, file_path):
         """Safely load YAML file with error handling"""
         try:
-            with open(file_path, 'r') as f:
-                content = f.read()
+            # Raw bytes: both parsers decode internally
+            content = _read_bytes(file_path)
 
-            # Try to fix common YAML issues
-            # Remove undefined aliases
-            content = re.sub(r'&\w+', '', content)
-            content = re.sub(r'\*\w+', '', content)
+            # JSON is a YAML subset and far cheaper to parse
+            data = _try_json_first(content)
+            if data is not None:
+                return data
 
-            # Try to parse
-            data = yaml.safe_load(content)
-            return data
+            # Try to parse; anchors and aliases are handled by libyaml
+            try:
+                return yaml.load(content, Loader=CLoader)
+            except (yaml.composer.ComposerError, yaml.constructor.ConstructorError):
+                # Slow path for broken files, e.g. aliases to undefined anchors
+                return yaml.load(content, Loader=_LenientLoader)
         except yaml.YAMLError as e:
             # Try loading as JSON if YAML fails
             try:
@@ -138,27 +356,24 @@ class RobustConfigConsolidator:
         config = {}
         try:
             with open(file_path, 'r') as f:
-                content = f.read()
+                tree = ast.parse(f.read(), filename=str(file_path))
 
-            # Extract simple variable assignments
-            pattern = r'^([A-Z_]+)\s*=\s*(.+)$'
-            for match in re.finditer(pattern, content, re.MULTILINE):
-                var_name = match.group(1)
-                var_value = match.group(2).strip()
+            # Extract simple module-level assignments
+            for node in tree.body:
+                if not (isinstance(node, ast.Assign) and len(node.targets) == 1):
+                    continue
+                target = node.targets[0]
+                if not (isinstance(target, ast.Name) and target.id.isupper()):
+                    continue
                 try:
-                    # Try to evaluate the value safely
-                    if var_value.startswith('"') or var_value.startswith("'"):
-                        config[var_name] = var_value.strip('"\'')
-                    elif var_value.isdigit():
-                        config[var_name] = int(var_value)
-                    elif var_value.replace('.', '').isdigit():
-                        config[var_name] = float(var_value)
-                    elif var_value.lower() in ['true', 'false']:
-                        config[var_name] = var_value.lower() == 'true'
-                    else:
-                        config[var_name] = var_value
-                except:
-                    config[var_name] = var_value
+                    value = ast.literal_eval(node.value)
+                except (ValueError, TypeError):
+                    value = _MISSING
+                if value is _MISSING or not _is_json_value(value):
+                    # Not a JSON-representable literal (calls, names, sets,
+                    # bytes, ...) - keep the source text
+                    value = ast.unparse(node.value)
+                config[target.id] = value
 
         except Exception as e:
             self.errors.append(f"Error extracting Python config from {file_path}: {str(e)}")
@@ -170,53 +385,47 @@ class RobustConfigConsolidator:
         if not config:
             return None
 
-        path_str = str(file_path).lower()
-
         # Determine category based on path and content
-        if 'agent' in path_str:
-            return 'agents'
-        elif 'database' in path_str or 'db' in path_str:
-            return 'database'
-        elif 'api' in path_str or 'endpoint' in path_str:
-            return 'api'
-        elif 'model' in path_str:
-            return 'models'
-        elif 'engine' in path_str:
-            return 'engines'
-        elif 'service' in path_str:
-            return 'services'
-        elif 'test' in path_str:
-            return 'testing'
-        else:
-            # Check content for hints
-            if isinstance(config, dict):
-                keys = set(str(k).lower() for k in config.keys())
-                if any(k in keys for k in ['host', 'port', 'database', 'db']):
-                    return 'database'
-                elif any(k in keys for k in ['api', 'endpoint', 'routes']):
-                    return 'api'
-                elif any(k in keys for k in ['model', 'weights', 'parameters']):
-                    return 'models'
-
-            return 'general'
+        category = _categorize_path(str(file_path).lower())
+        if category:
+            return category
+
+        # Check content for hints
+        if isinstance(config, dict):
+            keys = set(str(k).lower() for k in config.keys())
+            if any(k in keys for k in ['host', 'port', 'database', 'db']):
+                return 'database'
+            elif any(k in keys for k in ['api', 'endpoint', 'routes']):
+                return 'api'
+            elif any(k in keys for k in ['model', 'weights', 'parameters']):
+                return 'models'
+
+        return 'general'
 
     def merge_configs(self, base, new, path=""):
-        """Recursively merge configurations"""
+        """Merge configurations (iteratively, with an explicit stack)"""
         if not isinstance(base, dict) or not isinstance(new, dict):
             return new
 
-        for key, value in new.items():
-            if key in base:
-                if isinstance(base[key], dict) and isinstance(value, dict):
-                    base[key] = self.merge_configs(base[key], value, f"{path}.{key}")
-                elif isinstance(base[key], list) and isinstance(value, list):
-                    # Merge lists by extending
-                    base[key].extend(x for x in value if x not in base[key])
+        stack = [(base, new)]
+        while stack:
+            target, source = stack.pop()
+            for key, value in source.items():
+                current = target.get(key, _MISSING)
+                kind = type(current)
+                if kind is dict and type(value) is dict:
+                    stack.append((current, value))
+                elif kind is list and type(value) is list:
+                    # Merge lists by extending with unseen items
+                    seen = set(map(_freeze, current))
+                    for item in value:
+                        frozen = _freeze(item)
+                        if frozen not in seen:
+                            seen.add(frozen)
+                            current.append(item)
                 else:
-                    # Override with new value
-                    base[key] = value
-            else:
-                base[key] = value
+                    # New key, or override with new value
+                    target[key] = value
 
         return base
 
@@ -224,8 +433,11 @@ class RobustConfigConsolidator:
         """Consolidate all configurations"""
         print("\nAnalyzing and consolidating configurations...")
 
-        for config_file in self.config_files:
-            config = self.load_config(config_file)
+        # Parse files concurrently, then categorize and store serially
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            configs = list(executor.map(self.load_config, self.config_files))
+
+        for config_file, config in zip(self.config_files, configs):
             if not config:
                 continue
 
@@ -234,11 +446,9 @@ class RobustConfigConsolidator:
                 continue
 
             # Store with file path as key for traceability
-            file_key = str(config_file.relative_to(self.root_dir))
-
-            if category not in self.consolidated_config:
-                self.consolidated_config[category] = {}
+            file_key = str(config_file)[self._root_prefix_len:]
 
+            # consolidated_config is a defaultdict, so this creates the category
             self.consolidated_config[category][file_key] = {
                 'path': file_key,
                 'category': category,
@@ -258,7 +468,7 @@ class RobustConfigConsolidator:
         for category, configs in self.consolidated_config.items():
             category_file = output_dir / f"{category}_consolidated.json"
             with open(category_file, 'w') as f:
-                json.dump(configs, f, indent=2)
+                _dump_json(configs, f)
             print(f"Saved {category} configurations to {category_file}")
 
         # Save master configuration
@@ -275,7 +485,7 @@ class RobustConfigConsolidator:
 
         master_file = output_dir / "master_config.json"
         with open(master_file, 'w') as f:
-            json.dump(master_config, f, indent=2)
+            _dump_json(master_config, f)
         print(f"\nSaved master configuration to {master_file}")
 
         # Save error report
@@ -306,7 +516,7 @@ class RobustConfigConsolidator:
 
         summary_file = self.root_dir / "consolidated_config" / "consolidation_summary.json"
         with open(summary_file, 'w') as f:
-            json.dump(summary, f, indent=2)
+            _dump_json(summary, f)
 
         # Print summary
         print("\n" + "=" * 50)
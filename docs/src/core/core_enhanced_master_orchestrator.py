@@ -4,33 +4,251 @@ Enhanced Master Orchestrator for ncOS v21.7
 Incorporates patterns from llm_orchestrator.py and agent_profile_schemas.py
 """
 
+import asyncio
+import functools
+import hashlib
 import json
 import logging
+import os
+import re
+import struct
+import sys
+import time
+import weakref
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Optional
 
 import yaml
 
-# Import agent profile schema
-try:
-    from schemas.agent_profile_schemas import AgentProfileSchema
-    from schemas.module_configs import (
-        BaseModuleConfig, DataIngestionConfig, ContextAnalyzerConfig,
-        LiquidityEngineConfig, StructureValidatorConfig, RiskManagerConfig,
-        ConfluenceStackerConfig, ExecutorConfig, JournalerConfig
-    )
-except ImportError:
-    from pydantic import BaseModel, Field
+logger = logging.getLogger(__name__)
 
+# Module config schemas, imported from schemas.module_configs on first access
+_MODULE_CONFIG_NAMES = frozenset({
+    "BaseModuleConfig", "DataIngestionConfig", "ContextAnalyzerConfig",
+    "LiquidityEngineConfig", "StructureValidatorConfig", "RiskManagerConfig",
+    "ConfluenceStackerConfig", "ExecutorConfig", "JournalerConfig",
+})
 
-    class BaseModuleConfig(BaseModel):
-        enabled: bool = True
 
-        class Config:
-            extra = "allow"
+@functools.lru_cache(maxsize=None)
+def _agent_profile_schema():
+    """AgentProfileSchema, or None when the schemas package is unavailable.
 
-logger = logging.getLogger(__name__)
+    Imported on first use, so pydantic only loads once a profile actually
+    needs validating.
+    """
+    try:
+        from schemas.agent_profile_schemas import AgentProfileSchema
+    except ImportError:
+        return None
+    return AgentProfileSchema
+
+
+def _profile_schema_fingerprint() -> str:
+    """Identify how profiles get validated right now.
+
+    Cached profiles are only reused under the same fingerprint, so profiles
+    loaded without the schema package, or under an older schema, are
+    validated again.
+    """
+    schema = _agent_profile_schema()
+    if schema is None:
+        return "unvalidated"
+    identity = f"{schema.__module__}.{schema.__qualname__}"
+    source = getattr(sys.modules.get(schema.__module__), "__file__", None)
+    try:
+        stat = os.stat(source)
+    except (OSError, TypeError):
+        return identity
+    return f"{identity}:{source}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def _is_json_value(value) -> bool:
+    """True if value comes back from a JSON round trip unchanged"""
+    kind = type(value)
+    if value is None or kind in (str, int, float, bool):
+        return True
+    if kind is list:
+        return all(_is_json_value(item) for item in value)
+    if kind is dict:
+        return all(type(key) is str and _is_json_value(item) for key, item in value.items())
+    return False
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _MODULE_CONFIG_NAMES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        from schemas import module_configs
+    except ImportError:
+        if name != "BaseModuleConfig":
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+        from pydantic import BaseModel
+
+        class BaseModuleConfig(BaseModel):
+            enabled: bool = True
+
+            class Config:
+                extra = "allow"
+
+        value = BaseModuleConfig
+    else:
+        value = getattr(module_configs, name)
+    globals()[name] = value
+    return value
+
+# libyaml-backed loader when PyYAML was built with it
+CLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# Agent profiles from previous runs, keyed by file path; JSON, so reading
+# it back can never run code
+AGENT_PROFILE_CACHE = Path("logs/.agent_profile_cache.json")
+AGENT_PROFILE_CACHE_VERSION = 1
+
+# Threads used to parse and validate changed agent profiles
+PROFILE_LOAD_WORKERS = 8
+
+# Journal batching: pending entries are written after this many seconds,
+# or as soon as this many bytes are waiting
+JOURNAL_FLUSH_INTERVAL = 0.1
+JOURNAL_BUFFER_BYTES = 64 * 1024
+
+# Default number of recent journal entries kept in memory for recaps
+RECAP_WINDOW = 500
+
+
+@functools.lru_cache(maxsize=128)
+def _load_yaml_cached(path: str, mtime_ns: int) -> Any:
+    """Parse a YAML file once per modification time.
+
+    The parsed object is shared between callers, so treat it as read-only.
+    """
+    with open(path, 'rb') as f:
+        return yaml.load(f, Loader=CLoader)
+
+
+def _load_yaml(path: Path) -> Any:
+    """Load a YAML file through the mtime-keyed parse cache"""
+    return _load_yaml_cached(str(path), path.stat().st_mtime_ns)
+
+
+# Every keyword route_command reacts to, found in one scan. The lookahead
+# reports overlapping hits, matching the substring tests it replaces.
+_COMMAND_KEYWORD_RE = re.compile(
+    r'(?=(mark|tag|scan|xauusd|gold|btc|eur|show|entry|analysis'
+    r'|session|start|end|stop|recap))'
+)
+_SCAN_SYMBOLS = frozenset({"xauusd", "gold", "btc", "eur"})
+
+# route_command rules, checked in order: (keyword groups, handler). A rule
+# applies when the prompt hits at least one keyword from every group.
+_COMMAND_ROUTES = [
+    # Voice journal commands
+    ((frozenset({"mark", "tag"}),),
+     lambda self, prompt, lower: self._handle_voice_tag(prompt, lower)),
+    # ZBAR analysis commands
+    ((frozenset({"scan"}), _SCAN_SYMBOLS),
+     lambda self, prompt, lower: self._run_zbar_analysis(self._extract_symbol(lower))),
+    # Show analysis results
+    ((frozenset({"show"}), frozenset({"entry", "analysis"})),
+     lambda self, prompt, lower: self._show_latest_analysis(lower)),
+    # Session commands
+    ((frozenset({"session"}), frozenset({"start"})),
+     lambda self, prompt, lower: self._start_session()),
+    ((frozenset({"session"}), frozenset({"end", "stop"})),
+     lambda self, prompt, lower: self._end_session()),
+    ((frozenset({"session"}), frozenset({"recap"})),
+     lambda self, prompt, lower: self._session_recap()),
+]
+
+# _extract_symbol keywords, first match wins
+_SYMBOL_KEYWORDS = (
+    ("gold", "XAUUSD"),
+    ("xauusd", "XAUUSD"),
+    ("btc", "BTCUSD"),
+    ("bitcoin", "BTCUSD"),
+    ("eur", "EURUSD"),
+    ("euro", "EURUSD"),
+)
+
+# Lowercased voice tag word -> (field, value) it sets
+_VOICE_TAG_TOKENS = {
+    **{symbol.lower(): ("symbol", symbol) for symbol in ("XAUUSD", "GOLD", "BTCUSD", "EURUSD")},
+    **{bias: ("bias", bias) for bias in ("bullish", "bearish", "neutral")},
+    **{tf.lower(): ("timeframe", tf) for tf in ("M1", "M5", "M15", "M30", "H1", "H4", "D1")},
+}
+
+# Journal index record: byte offset and length of one journal line, plus
+# a digest of its session_id
+JOURNAL_INDEX_RECORD = struct.Struct('<QI16s')
+
+# Compact single-line encoder for journal entries, built once
+_JOURNAL_ENCODER = json.JSONEncoder(separators=(',', ':'), check_circular=False)
+
+
+def _recap_row(entry: dict) -> tuple:
+    """The fields of a journal entry that _session_recap counts"""
+    return (entry.get("session_id"), entry.get("analysis_type"),
+            entry.get("type"), entry.get("symbol"))
+
+
+def _close_journal(fp, pending: list):
+    """Write entries still waiting in the journal buffer and close it.
+
+    The index is not touched; the next sync picks these lines up.
+    """
+    if pending:
+        fp.write(b''.join(payload for payload, _ in pending))
+        pending.clear()
+    fp.close()
+
+
+def _session_key(session_id: Any) -> bytes:
+    """Fixed-size index key for a journal entry's session_id"""
+    return hashlib.blake2b(str(session_id or "").encode('utf-8'), digest_size=16).digest()
+
+
+# (second, "YYYY-MM-DDTHH:MM:SS") of the last _utc_now_iso call
+_iso_second = (None, "")
+
+
+def _utc_now_iso() -> str:
+    """datetime.utcnow().isoformat() with microseconds, formatting the
+    date and time part at most once per second."""
+    global _iso_second
+    sec, ns = divmod(time.time_ns(), 1_000_000_000)
+    cached_sec, prefix = _iso_second
+    if sec != cached_sec:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec))
+        _iso_second = (sec, prefix)
+    return f"{prefix}.{ns // 1000:06d}"
+
+
+def _tail_jsonl(path: Path, n: int, chunk_size: int = 8192):
+    """Yield up to the last n entries of a JSONL file, newest first.
+
+    Reads backwards in chunks, so the cost depends on n, not the file size.
+    """
+    found = 0
+    with open(path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        partial = b''
+        while pos > 0:
+            step = min(chunk_size, pos)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + partial).split(b'\n')
+            # The first piece may be the tail of a line that starts earlier
+            partial = lines[0] if pos > 0 else b''
+            for line in reversed(lines if pos == 0 else lines[1:]):
+                if line.strip():
+                    yield json.loads(line)
+                    found += 1
+                    if found == n:
+                        return
 
 
 class MasterOrchestrator:
@@ -45,6 +263,21 @@ class MasterOrchestrator:
         self.agents = {}
         self.state = {"initialized": False}
         self.journal_path = Path("logs/trade_journal.jsonl")
+        self.journal_index_path = self.journal_path.with_suffix(".idx")
+        self._journal_fp = None
+        self._index_fp = None
+        # (line, session_id) pairs waiting for the next flush_journal
+        self._journal_buf = []
+        self._journal_buf_bytes = 0
+        # Pending delayed flush and the event loop it was scheduled on
+        self._journal_flush_handle = None
+        self._journal_flush_loop = None
+        # session key -> [(offset, length)] of its journal lines
+        self._session_index = None
+        self._indexed_end = 0
+        # Recap rows of the latest entries this orchestrator journaled
+        recap_window = (self.config.get("orchestration") or {}).get("recap_window", RECAP_WINDOW)
+        self._recent_entries = deque(maxlen=recap_window)
 
         # Initialize logging
         self._setup_logging()
@@ -58,8 +291,7 @@ class MasterOrchestrator:
         """Load main configuration"""
         config_file = Path(self.config_path)
         if config_file.exists():
-            with open(config_file, 'r') as f:
-                return yaml.safe_load(f) or {}
+            return _load_yaml(config_file) or {}
         return self._get_default_config()
 
     def _get_default_config(self) -> dict:
@@ -93,72 +325,122 @@ class MasterOrchestrator:
         """Load all agent profiles from config directory"""
         agent_dir = Path("config/agents")
         if agent_dir.exists():
+            fingerprint = _profile_schema_fingerprint()
+            cache = self._read_profile_cache(fingerprint)
+            next_cache = {}
+
+            # Stat every file; only new or changed ones need parsing
+            agent_files = []
+            misses = []
             for agent_file in agent_dir.glob("*.yaml"):
                 try:
-                    with open(agent_file, 'r') as f:
-                        profile_data = yaml.safe_load(f)
-
-                    # Validate with schema if available
-                    if 'AgentProfileSchema' in globals():
-                        profile = AgentProfileSchema(**profile_data)
-                        self.agents[profile.profile_name] = profile.dict()
+                    stat = agent_file.stat()
+                except OSError as e:
+                    logger.error(f"Failed to load agent {agent_file}: {e}")
+                    continue
+                entry = cache.get(str(agent_file))
+                if not (isinstance(entry, list) and len(entry) == 4
+                        and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size):
+                    entry = None
+                    misses.append(agent_file)
+                agent_files.append((agent_file, stat, entry))
+
+            # Parse and validate the misses concurrently, then record
+            # every profile serially, in directory order
+            futures = {}
+            if misses:
+                with ThreadPoolExecutor(max_workers=PROFILE_LOAD_WORKERS) as executor:
+                    futures = {f: executor.submit(self._load_one_profile, f) for f in misses}
+
+            for agent_file, stat, entry in agent_files:
+                try:
+                    if entry:
+                        # Unchanged since it was last loaded the same way
+                        name, profile = entry[2], entry[3]
                     else:
-                        self.agents[profile_data.get('profile_name', agent_file.stem)] = profile_data
+                        name, profile = futures[agent_file].result()
 
+                    self.agents[name] = profile
+                    # Profiles that JSON cannot reproduce exactly are
+                    # simply loaded again next run
+                    if type(name) is str and _is_json_value(profile):
+                        next_cache[str(agent_file)] = [stat.st_mtime_ns, stat.st_size, name, profile]
                     logger.info(f"Loaded agent profile: {agent_file.stem}")
                 except Exception as e:
                     logger.error(f"Failed to load agent {agent_file}: {e}")
 
+            if next_cache != cache:
+                self._write_profile_cache(fingerprint, next_cache)
+
+    def _load_one_profile(self, agent_file: Path) -> tuple:
+        """Parse and validate one agent profile, returning (name, profile)"""
+        profile_data = _load_yaml(agent_file)
+
+        # Validate with schema if available
+        schema = _agent_profile_schema()
+        if schema is not None:
+            validated = schema(**profile_data)
+            return validated.profile_name, validated.dict()
+        return profile_data.get('profile_name', agent_file.stem), profile_data
+
+    def _read_profile_cache(self, fingerprint: str) -> dict:
+        """Cached profiles from a previous run that loaded them the same way"""
+        try:
+            with open(AGENT_PROFILE_CACHE, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            # Missing or truncated
+            return {}
+        if not (isinstance(cache, dict)
+                and cache.get("version") == AGENT_PROFILE_CACHE_VERSION
+                and cache.get("schema") == fingerprint
+                and isinstance(cache.get("profiles"), dict)):
+            return {}
+        return cache["profiles"]
+
+    def _write_profile_cache(self, fingerprint: str, profiles: dict):
+        """Persist the loaded agent profiles for the next run"""
+        cache = {
+            "version": AGENT_PROFILE_CACHE_VERSION,
+            "schema": fingerprint,
+            "profiles": profiles,
+        }
+        try:
+            AGENT_PROFILE_CACHE.parent.mkdir(parents=True, exist_ok=True)
+            with open(AGENT_PROFILE_CACHE, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, separators=(',', ':'))
+        except Exception as e:
+            logger.warning(f"Could not write agent profile cache: {e}")
+
     def route_command(self, prompt: str) -> Any:
         """
         Route natural language commands to appropriate handlers.
         Based on llm_orchestrator.py pattern.
         """
         prompt_lower = prompt.lower()
+        hits = set(_COMMAND_KEYWORD_RE.findall(prompt_lower))
 
-        # Voice journal commands
-        if "mark" in prompt_lower or "tag" in prompt_lower:
-            return self._handle_voice_tag(prompt)
-
-        # ZBAR analysis commands
-        if "scan" in prompt_lower and any(symbol in prompt_lower for symbol in ["xauusd", "gold", "btc", "eur"]):
-            symbol = self._extract_symbol(prompt_lower)
-            return self._run_zbar_analysis(symbol)
-
-        # Show analysis results
-        if "show" in prompt_lower and ("entry" in prompt_lower or "analysis" in prompt_lower):
-            return self._show_latest_analysis(prompt_lower)
-
-        # Session commands
-        if "session" in prompt_lower:
-            if "start" in prompt_lower:
-                return self._start_session()
-            elif "end" in prompt_lower or "stop" in prompt_lower:
-                return self._end_session()
-            elif "recap" in prompt_lower:
-                return self._session_recap()
+        for groups, handler in _COMMAND_ROUTES:
+            if all(not hits.isdisjoint(group) for group in groups):
+                return handler(self, prompt, prompt_lower)
 
         return f"[ORCHESTRATOR] Command not recognized: {prompt}"
 
-    def _handle_voice_tag(self, prompt: str) -> str:
+    def _handle_voice_tag(self, prompt: str, prompt_lower: Optional[str] = None) -> str:
         """Handle voice tagging for journal"""
-        # Extract key information
-        parts = prompt.split()
-        symbol = "XAUUSD"  # default
-        bias = "neutral"
-        timeframe = "H1"
-
-        for i, word in enumerate(parts):
-            if word.upper() in ["XAUUSD", "GOLD", "BTCUSD", "EURUSD"]:
-                symbol = word.upper()
-            elif word.lower() in ["bullish", "bearish", "neutral"]:
-                bias = word.lower()
-            elif word.upper() in ["M1", "M5", "M15", "M30", "H1", "H4", "D1"]:
-                timeframe = word.upper()
+        # Extract key information; the last matching word for a field wins
+        fields = {"symbol": "XAUUSD", "bias": "neutral", "timeframe": "H1"}
+        if prompt_lower is None:
+            prompt_lower = prompt.lower()
+        for word in prompt_lower.split():
+            token = _VOICE_TAG_TOKENS.get(word)
+            if token:
+                fields[token[0]] = token[1]
+        symbol, bias, timeframe = fields["symbol"], fields["bias"], fields["timeframe"]
 
         # Log to journal
         entry = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": _utc_now_iso(),
             "type": "voice_tag",
             "symbol": symbol,
             "bias": bias,
@@ -178,7 +460,7 @@ class MasterOrchestrator:
         # This would integrate with your actual ZBAR module
         analysis = {
             "symbol": symbol,
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": _utc_now_iso(),
             "analysis_type": "ZBAR",
             "result": {
                 "bias": "bullish",
@@ -195,39 +477,134 @@ class MasterOrchestrator:
         return analysis
 
     def _append_to_journal(self, entry: dict):
-        """Append entry to JSONL journal"""
-        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.journal_path, 'a') as f:
-            f.write(json.dumps(entry) + '\n')
+        """Queue entry for the JSONL journal.
+
+        Entries written from inside an event loop are batched and flushed
+        JOURNAL_FLUSH_INTERVAL seconds later, or sooner once
+        JOURNAL_BUFFER_BYTES are pending. Without a running loop nothing
+        would flush later, so the entry is written right away.
+        """
+        if self._journal_fp is None:
+            self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+            # Unbuffered on purpose: each flush is one write() that other
+            # journal readers see at once, and tell() stays exact for the index
+            self._journal_fp = open(self.journal_path, 'ab', buffering=0)
+            # Entries still pending when the orchestrator goes away are
+            # written on close
+            weakref.finalize(self, _close_journal, self._journal_fp, self._journal_buf)
+            self._sync_journal_index()
+
+        payload = (_JOURNAL_ENCODER.encode(entry) + '\n').encode('utf-8')
+        self._recent_entries.append(_recap_row(entry))
+        self._journal_buf.append((payload, entry.get("session_id")))
+        self._journal_buf_bytes += len(payload)
+
+        if self._journal_buf_bytes >= JOURNAL_BUFFER_BYTES:
+            self.flush_journal()
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        pending_loop = self._journal_flush_loop
+        if loop is None or (pending_loop is not None and pending_loop.is_closed()):
+            # No loop to run a timer, or the one holding the pending timer
+            # has gone away without running it
+            self.flush_journal()
+        elif self._journal_flush_handle is None or pending_loop is not loop:
+            if self._journal_flush_handle is not None:
+                self._journal_flush_handle.cancel()
+            self._journal_flush_handle = loop.call_later(JOURNAL_FLUSH_INTERVAL, self.flush_journal)
+            self._journal_flush_loop = loop
+
+    def flush_journal(self):
+        """Write pending journal entries and record their offsets in the index"""
+        if self._journal_flush_handle is not None:
+            self._journal_flush_handle.cancel()
+            self._journal_flush_handle = None
+            self._journal_flush_loop = None
+        if not self._journal_buf:
+            return
+
+        data = b''.join(payload for payload, _ in self._journal_buf)
+        self._journal_fp.write(data)
+        offset = self._journal_fp.tell() - len(data)
+        if offset != self._indexed_end:
+            # Another writer appended since the index was last synced
+            self._index_journal_range(self._indexed_end, offset)
+        for payload, session_id in self._journal_buf:
+            self._add_index_record(offset, len(payload), session_id)
+            offset += len(payload)
+
+        self._journal_buf.clear()
+        self._journal_buf_bytes = 0
+
+    def _sync_journal_index(self):
+        """Load the journal index and index any lines it is missing"""
+        if self._session_index is None:
+            self.journal_index_path.parent.mkdir(parents=True, exist_ok=True)
+            self._index_fp = open(self.journal_index_path, 'a+b', buffering=0)
+            weakref.finalize(self, self._index_fp.close)
+            self._index_fp.seek(0)
+            data = self._index_fp.read()
+            usable = len(data) - len(data) % JOURNAL_INDEX_RECORD.size
+            if usable != len(data):
+                # Drop a record torn by a crash mid-write
+                self._index_fp.truncate(usable)
+
+            self._session_index = defaultdict(list)
+            self._indexed_end = 0
+            for offset, length, key in JOURNAL_INDEX_RECORD.iter_unpack(memoryview(data)[:usable]):
+                self._session_index[key].append((offset, length))
+                self._indexed_end = offset + length
+
+        size = self.journal_path.stat().st_size if self.journal_path.exists() else 0
+        if size < self._indexed_end:
+            # The journal was truncated or replaced; rebuild the index
+            self._index_fp.truncate(0)
+            self._session_index.clear()
+            self._recent_entries.clear()
+            self._indexed_end = 0
+        if size > self._indexed_end:
+            self._index_journal_range(self._indexed_end, size)
+
+    def _index_journal_range(self, start: int, end: int):
+        """Index the journal lines between two byte offsets"""
+        with open(self.journal_path, 'rb') as f:
+            f.seek(start)
+            data = f.read(end - start)
+        offset = start
+        for line in data.splitlines(keepends=True):
+            try:
+                session_id = json.loads(line).get("session_id")
+            except (ValueError, AttributeError):
+                session_id = None
+            self._add_index_record(offset, len(line), session_id)
+            offset += len(line)
+
+    def _add_index_record(self, offset: int, length: int, session_id: Any):
+        """Append one journal line to the on-disk and in-memory index"""
+        key = _session_key(session_id)
+        self._index_fp.write(JOURNAL_INDEX_RECORD.pack(offset, length, key))
+        self._session_index[key].append((offset, length))
+        self._indexed_end = offset + length
 
     def _extract_symbol(self, text: str) -> str:
         """Extract trading symbol from text"""
-        symbol_map = {
-            "gold": "XAUUSD",
-            "xauusd": "XAUUSD",
-            "btc": "BTCUSD",
-            "bitcoin": "BTCUSD",
-            "eur": "EURUSD",
-            "euro": "EURUSD"
-        }
-
-        for key, symbol in symbol_map.items():
+        for key, symbol in _SYMBOL_KEYWORDS:
             if key in text:
                 return symbol
         return "XAUUSD"  # default
 
     def _show_latest_analysis(self, prompt: str) -> str:
         """Show latest analysis from journal"""
+        self.flush_journal()
         if not self.journal_path.exists():
             return "No analysis found in journal"
 
-        # Read last few entries
-        with open(self.journal_path, 'r') as f:
-            lines = f.readlines()
-
-        # Find latest analysis
-        for line in reversed(lines[-10:]):
-            entry = json.loads(line)
+        # Find latest analysis among the last few entries
+        for entry in _tail_jsonl(self.journal_path, 10):
             if entry.get("analysis_type") == "ZBAR":
                 return f"Latest analysis for {entry['symbol']}:\n{json.dumps(entry['result'], indent=2)}"
 
@@ -235,12 +612,15 @@ class MasterOrchestrator:
 
     def _start_session(self) -> str:
         """Start a new trading session"""
-        session_id = f"session_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
+        # One clock read for the id, the state and the journal entry
+        now = datetime.utcnow()
+        timestamp = now.isoformat(timespec="microseconds")
+        session_id = f"session_{now.strftime('%Y%m%d_%H%M%S')}"
         self.state["session_id"] = session_id
-        self.state["session_start"] = datetime.utcnow().isoformat()
+        self.state["session_start"] = timestamp
 
         entry = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": timestamp,
             "type": "session_start",
             "session_id": session_id
         }
@@ -254,13 +634,15 @@ class MasterOrchestrator:
             return "No active session"
 
         session_id = self.state["session_id"]
+        now = datetime.utcnow()
         entry = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": now.isoformat(timespec="microseconds"),
             "type": "session_end",
             "session_id": session_id,
-            "duration": self._calculate_session_duration()
+            "duration": self._calculate_session_duration(now)
         }
         self._append_to_journal(entry)
+        self.flush_journal()
 
         # Clear session state
         self.state.pop("session_id", None)
@@ -270,38 +652,63 @@ class MasterOrchestrator:
 
     def _session_recap(self) -> dict:
         """Generate session recap"""
+        self.flush_journal()
         if not self.journal_path.exists():
             return {"error": "No journal found"}
 
         current_session = self.state.get("session_id", "default")
 
-        with open(self.journal_path, 'r') as f:
-            entries = [json.loads(line) for line in f]
-
-        # Filter by session
-        session_entries = [e for e in entries if e.get("session_id") == current_session]
-
-        # Analyze entries
-        trades = [e for e in session_entries if e.get("analysis_type") == "ZBAR"]
-        voice_tags = [e for e in session_entries if e.get("type") == "voice_tag"]
+        # This session's lines, located through the index
+        self._sync_journal_index()
+        positions = self._session_index.get(_session_key(current_session), ())
+        recent = [row for row in self._recent_entries if row[0] == current_session]
+        if recent and len(recent) == len(positions):
+            # Every line of the session is still in the recent window
+            rows = recent
+        else:
+            rows = self._read_recap_rows(positions, current_session)
+
+        total = trades = voice_tags = 0
+        symbols = set()
+        for _, analysis_type, entry_type, symbol in rows:
+            total += 1
+            if analysis_type == "ZBAR":
+                trades += 1
+            if entry_type == "voice_tag":
+                voice_tags += 1
+            if symbol:
+                symbols.add(symbol)
 
         recap = {
             "session_id": current_session,
-            "total_entries": len(session_entries),
-            "trades_analyzed": len(trades),
-            "voice_tags": len(voice_tags),
-            "symbols": list(set(e.get("symbol") for e in session_entries if e.get("symbol")))
+            "total_entries": total,
+            "trades_analyzed": trades,
+            "voice_tags": voice_tags,
+            "symbols": list(symbols)
         }
 
         return recap
 
-    def _calculate_session_duration(self) -> str:
-        """Calculate session duration"""
+    def _read_recap_rows(self, positions, session_id: Any):
+        """Yield recap rows for the journal lines at the given positions"""
+        with open(self.journal_path, 'rb') as f:
+            for offset, length in positions:
+                f.seek(offset)
+                try:
+                    entry = json.loads(f.read(length))
+                except ValueError:
+                    continue
+                # Guards against digest collisions and non-dict lines
+                if isinstance(entry, dict) and entry.get("session_id") == session_id:
+                    yield _recap_row(entry)
+
+    def _calculate_session_duration(self, now: Optional[datetime] = None) -> str:
+        """Calculate session duration up to now (default: the current time)"""
         if "session_start" not in self.state:
             return "unknown"
 
         start = datetime.fromisoformat(self.state["session_start"])
-        duration = datetime.utcnow() - start
+        duration = (now or datetime.utcnow()) - start
         hours, remainder = divmod(duration.seconds, 3600)
         minutes, seconds = divmod(remainder, 60)
 
@@ -320,7 +727,7 @@ class MasterOrchestrator:
             "status": "completed",
             "symbol": symbol,
             "variant": variant,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": _utc_now_iso()
         }
 
 
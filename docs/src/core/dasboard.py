@@ -761,6 +761,12 @@ class AnalysisEntry(BaseModel):
     content: dict
     timestamp: datetime = None
 
+class JournalBatch(BaseModel):
+    """One pipeline run: its journal entry, stage analyses and optional trade"""
+    pipeline: JournalEntry
+    stages: List[AnalysisEntry] = []
+    trade: Optional[TradeEntry] = None
+
 @app.get("/")
 def read_root():
     return {
@@ -769,6 +775,7 @@ def read_root():
             "trades": "/trades",
             "journal": "/journal",
             "analysis": "/analysis",
+            "journal_batch": "/journal/batch",
             "stats": "/stats",
             "zbar": "/zbar/*"
         }
@@ -859,6 +866,28 @@ def create_analysis(analysis: AnalysisEntry):
     
     return {"message": "Analysis logged", "analysis": analysis_dict}
 
+@app.post("/journal/batch")
+def create_journal_batch(batch: JournalBatch):
+    """Log a pipeline run's journal entry, stage analyses and trade in one request"""
+    now = datetime.now()
+    month = now.strftime('%Y%m')
+
+    # Stage analyses grouped by file, so each file gets a single append
+    analysis_lines = {}
+    for analysis in batch.stages:
+        analysis_dict = analysis.dict()
+        analysis_dict['timestamp'] = (analysis.timestamp or now).isoformat()
+        analysis_file = ANALYSIS_DIR / f"analysis_{analysis.symbol}_{month}.jsonl"
+        analysis_lines.setdefault(analysis_file, []).append(json.dumps(analysis_dict) + '\\n')
+    for analysis_file, lines in analysis_lines.items():
+        with open(analysis_file, 'a') as f:
+            f.write(''.join(lines))
+
+    entry = create_journal_entry(batch.pipeline)["entry"]
+    trade = create_trade(batch.trade)["trade"] if batch.trade is not None else None
+
+    return {"message": "Journal batch logged", "entry": entry, "stages": len(batch.stages), "trade": trade}
+
 @app.get("/stats")
 def get_stats():
     """Get trading statistics"""
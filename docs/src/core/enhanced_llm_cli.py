@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 import asyncio
+import functools
+import os
+import sys
 from datetime import datetime
 from typing import Any, Dict, Optional
 
@@ -11,16 +14,165 @@ from config.gpt_instructions import (
 
 from menu_system import EnhancedMenuSystem
 
+# libyaml-backed dumper when PyYAML was built with it
+CDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+# How often the monitor asks the orchestrator for timed-out agents
+AGENT_TIMEOUT_POLL_SECONDS = 30
+
+# Command handlers, checked in order: (keywords, handler method). The first
+# handler with a keyword in the command wins.
+_COMMAND_ROUTES = [
+    (("pattern", "detect", "analyze"), "_handle_pattern_command"),
+    (("risk", "position", "size"), "_handle_risk_command"),
+    (("signal", "trade", "buy", "sell"), "_handle_signal_command"),
+]
+
+# The same rules flattened to keyword -> handler. Keywords keep the table
+# order, so the first keyword found picks the first matching rule.
+_COMMAND_KEYWORDS = {
+    keyword: handler for keywords, handler in _COMMAND_ROUTES for keyword in keywords
+}
+
+_HELP_TEXT = """
+🎯 Bootstrap OS v5.5.2 Enhanced CLI Commands:
+
+Pattern Analysis:
+  • "detect patterns in XAUUSD"
+  • "analyze order blocks"
+  • "find fair value gaps"
+
+Risk Management:
+  • "calculate risk for 0.1 lot EURUSD"
+  • "show risk parameters"
+  • "validate position size"
+
+Trading Signals:
+  • "generate buy signal for XAUUSD"
+  • "create trading recommendation"
+  • "consensus decision on GBPUSD"
+
+System Commands:
+  • "system status"
+  • "list agents"
+  • "memory status"
+
+  • "help"
+
+Features:
+  ✓ Vector memory integration
+  ✓ Auto-progression on triggers
+  ✓ Token-optimized responses
+  ✓ Multi-agent consensus
+  ✓ Session auto-save
+"""
+
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+def _freeze(value: Any) -> tuple:
+    """Hashable, type-tagged form of a JSON-like payload.
+
+    Tagging keeps 1, 1.0 and True apart, since they dump differently.
+    Raises TypeError for anything else.
+    """
+    kind = type(value)
+    if kind is dict:
+        return (dict, tuple((_freeze(k), _freeze(v)) for k, v in value.items()))
+    if kind is list or kind is tuple:
+        return (kind, tuple(_freeze(v) for v in value))
+    if kind in _SCALAR_TYPES:
+        return (kind, value)
+    raise TypeError(f"cannot freeze {kind.__name__}")
+
+
+def _thaw(frozen: tuple) -> Any:
+    """Rebuild the payload _freeze was given"""
+    kind, value = frozen
+    if kind is dict:
+        return {_thaw(k): _thaw(v) for k, v in value}
+    if kind is list:
+        return [_thaw(v) for v in value]
+    if kind is tuple:
+        return tuple(_thaw(v) for v in value)
+    return value
+
+
+class _AsyncLineReader:
+    """Read stdin lines without blocking the event loop.
+
+    Waits for input with loop.add_reader, so no thread is left stuck in a
+    read when the CLI exits. Loops without add_reader support (the Windows
+    proactor loop) and stdin redirected from a regular file, which epoll
+    refuses to watch, read on the default executor instead.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self._encoding = getattr(sys.stdin, "encoding", None) or "utf-8"
+
+    async def readline(self, prompt: str) -> str:
+        print(prompt, end="", flush=True)
+        while b"\n" not in self._buffer:
+            chunk = await self._read_chunk()
+            if not chunk:
+                if self._buffer:
+                    break  # last line has no newline
+                raise EOFError
+            self._buffer += chunk
+        line, _, rest = bytes(self._buffer).partition(b"\n")
+        self._buffer = bytearray(rest)
+        return line.decode(self._encoding, errors="replace").rstrip("\r")
+
+    async def _read_chunk(self) -> bytes:
+        loop = asyncio.get_running_loop()
+        fd = sys.stdin.fileno()
+        future = loop.create_future()
+
+        def on_readable() -> None:
+            if not future.done():
+                try:
+                    future.set_result(os.read(fd, 4096))
+                except OSError as exc:
+                    future.set_exception(exc)
+
+        try:
+            loop.add_reader(fd, on_readable)
+        except (NotImplementedError, OSError):
+            # PermissionError from epoll for regular files; reads on those
+            # never block, so the executor thread cannot get stuck
+            return await loop.run_in_executor(None, os.read, fd, 4096)
+        try:
+            return await future
+        finally:
+            loop.remove_reader(fd)
+
+
+@functools.lru_cache(maxsize=256)
+def _dump_yaml_frozen(frozen: tuple) -> str:
+    return yaml.dump(_thaw(frozen), Dumper=CDumper, default_flow_style=False, sort_keys=False)
+
 
 class EnhancedLLMCLI:
     """Enhanced LLM Native CLI with auto-progression and vector awareness."""
 
     def __init__(self, bootstrap_system: Any) -> None:
         self.bootstrap = bootstrap_system
+        # Resolved components; see invalidate_component for hot-swaps
+        self._component_cache: Dict[str, Any] = {}
         self.auto_progression = get_auto_progression_config()
+        # Trigger thresholds read on every command and monitor tick
+        triggers = self.auto_progression["triggers"]
+        self._pattern_threshold = triggers["pattern_confidence_threshold"]
+        self._risk_threshold = triggers["risk_score_threshold"]
+        self._consensus_threshold = triggers["consensus_threshold"]
+        self._session_save_interval = triggers["session_save_interval"]
         self.menu_system = EnhancedMenuSystem(self._get_component("orchestrator"))
         self.session_active = False
         self.last_progression = datetime.now()
+        # Set whenever auto-progression state changes, to re-plan the monitor
+        self._wake = asyncio.Event()
+        self._stdin = _AsyncLineReader()
 
     async def start(self) -> None:
         """Start the enhanced CLI loop."""
@@ -42,7 +194,8 @@ class EnhancedLLMCLI:
 
         while self.session_active:
             try:
-                user_input = input("\nBootstrap OS> ").strip()
+                # Read without blocking the loop, so the monitor keeps running
+                user_input = (await self._stdin.readline("\nBootstrap OS> ")).strip()
 
                 if not user_input:
                     continue
@@ -54,7 +207,8 @@ class EnhancedLLMCLI:
                 response = await self._process_command_with_vectors(user_input)
                 print(f"\n{response}")
 
-            except KeyboardInterrupt:
+            except (KeyboardInterrupt, asyncio.CancelledError):
+                # asyncio.run delivers Ctrl-C by cancelling the pending await
                 await self._graceful_shutdown()
                 break
             except Exception as exc:  # pragma: no cover - interactive safety
@@ -75,13 +229,10 @@ class EnhancedLLMCLI:
                 relevant_context = []
 
         lower = command.lower()
-        if any(k in lower for k in ["pattern", "detect", "analyze"]):
-            return await self._handle_pattern_command(command, relevant_context)
-        if any(k in lower for k in ["risk", "position", "size"]):
-            return await self._handle_risk_command(command, relevant_context)
-        if any(k in lower for k in ["signal", "trade", "buy", "sell"]):
-            return await self._handle_signal_command(command, relevant_context)
-        return await self._handle_general_command(command, relevant_context)
+        handler = next((h for k, h in _COMMAND_KEYWORDS.items() if k in lower), None)
+        if handler is not None:
+            return await getattr(self, handler)(command, relevant_context)
+        return await self._handle_general_command(command, relevant_context, lower)
 
     # ------------------------------------------------------------------
     async def _handle_pattern_command(self, command: str, context: list[Any]) -> str:
@@ -100,9 +251,7 @@ class EnhancedLLMCLI:
         if hasattr(orchestrator, "execute_agent_task"):
             result = await orchestrator.execute_agent_task("pattern_scanner", task)
 
-        if result.get("confidence", 0) > self.auto_progression["triggers"][
-            "pattern_confidence_threshold"
-        ]:
+        if result.get("confidence", 0) > self._pattern_threshold:
             await self._trigger_auto_progression("high_confidence_pattern", result)
 
         return self._format_yaml_response(result)
@@ -116,9 +265,7 @@ class EnhancedLLMCLI:
         if hasattr(risk_guardian, "analyze_with_context"):
             risk_analysis = await risk_guardian.analyze_with_context(command, context)
 
-        if risk_analysis.get("risk_score", 0) > self.auto_progression["triggers"][
-            "risk_score_threshold"
-        ]:
+        if risk_analysis.get("risk_score", 0) > self._risk_threshold:
             await self._trigger_auto_progression("high_risk", risk_analysis)
 
         return self._format_yaml_response(risk_analysis)
@@ -140,13 +287,16 @@ class EnhancedLLMCLI:
             result = await orchestrator.execute_with_consensus(signal_task)
 
         consensus_score = result.get("consensus_score", 0)
-        if consensus_score >= self.auto_progression["triggers"]["consensus_threshold"]:
+        if consensus_score >= self._consensus_threshold:
             await self._trigger_auto_progression("consensus_reached", result)
 
         return self._format_yaml_response(result)
 
-    async def _handle_general_command(self, command: str, context: list[Any]) -> str:
-        lower = command.lower()
+    async def _handle_general_command(
+        self, command: str, context: list[Any], lower: Optional[str] = None
+    ) -> str:
+        if lower is None:
+            lower = command.lower()
         if "status" in lower:
             return await self._get_system_status()
         if "agents" in lower:
@@ -160,19 +310,35 @@ class EnhancedLLMCLI:
 
     # ------------------------------------------------------------------
     async def _auto_progression_monitor(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_timeout_poll = loop.time()
         while self.session_active:
             try:
                 elapsed = (datetime.now() - self.last_progression).total_seconds()
-                if elapsed > self.auto_progression["triggers"]["session_save_interval"]:
+                if elapsed >= self._session_save_interval:
                     await self._trigger_auto_progression("session_save", {})
 
-                orchestrator = self._get_component("orchestrator")
-                if orchestrator and hasattr(orchestrator, "check_agent_timeouts"):
-                    timeouts = await orchestrator.check_agent_timeouts()
-                    if timeouts:
-                        await self._trigger_auto_progression("timeout", timeouts)
-
-                await asyncio.sleep(30)
+                if loop.time() >= next_timeout_poll:
+                    next_timeout_poll = loop.time() + AGENT_TIMEOUT_POLL_SECONDS
+                    orchestrator = self._get_component("orchestrator")
+                    if orchestrator and hasattr(orchestrator, "check_agent_timeouts"):
+                        timeouts = await orchestrator.check_agent_timeouts()
+                        if timeouts:
+                            await self._trigger_auto_progression("timeout", timeouts)
+
+                # Sleep until the session save is due or the next timeout
+                # poll, whichever is first; _wake cuts the sleep short
+                delay = next_timeout_poll - loop.time()
+                save_in = self._session_save_interval - (
+                    datetime.now() - self.last_progression
+                ).total_seconds()
+                if save_in > 0:
+                    delay = min(delay, save_in)
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=max(delay, 0))
+                except asyncio.TimeoutError:
+                    pass
             except Exception as exc:  # pragma: no cover - monitor resilience
                 print(f"Auto-progression monitor error: {exc}")
                 await asyncio.sleep(60)
@@ -196,6 +362,7 @@ class EnhancedLLMCLI:
             await self._auto_request_review(data)
 
         self.last_progression = datetime.now()
+        self._wake.set()
 
     async def _auto_generate_signal(self, data: Dict[str, Any]) -> None:
         print("📊 Auto-generating trading signal based on high-confidence pattern...")
@@ -227,11 +394,33 @@ class EnhancedLLMCLI:
     # ------------------------------------------------------------------
     def _format_yaml_response(self, data: Dict[str, Any]) -> str:
         try:
-            return yaml.dump(data, default_flow_style=False, sort_keys=False)
+            try:
+                frozen = _freeze(data)
+            except TypeError:
+                # Not a plain payload; dump it uncached
+                return yaml.dump(data, Dumper=CDumper, default_flow_style=False, sort_keys=False)
+            # Repeated payloads (status dicts, say) are served from the cache
+            return _dump_yaml_frozen(frozen)
         except Exception:
             return str(data)
 
     def _get_component(self, name: str) -> Any | None:
+        component = self._component_cache.get(name)
+        if component is None:
+            component = self._resolve_component(name)
+            # Misses are not cached, so late-registered components are found
+            if component is not None:
+                self._component_cache[name] = component
+        return component
+
+    def invalidate_component(self, name: Optional[str] = None) -> None:
+        """Forget a cached component (or all of them) after a hot-swap."""
+        if name is None:
+            self._component_cache.clear()
+        else:
+            self._component_cache.pop(name, None)
+
+    def _resolve_component(self, name: str) -> Any | None:
         if hasattr(self.bootstrap, "get_component"):
             return self.bootstrap.get_component(name)
         if hasattr(self.bootstrap, "get_agent"):
@@ -297,40 +486,7 @@ class EnhancedLLMCLI:
         print("✅ Bootstrap OS CLI shutdown complete")
 
     def _get_help_text(self) -> str:
-        return (
-            """
-🎯 Bootstrap OS v5.5.2 Enhanced CLI Commands:
-
-Pattern Analysis:
-  • "detect patterns in XAUUSD"
-  • "analyze order blocks"
-  • "find fair value gaps"
-
-Risk Management:
-  • "calculate risk for 0.1 lot EURUSD"
-  • "show risk parameters"
-  • "validate position size"
-
-Trading Signals:
-  • "generate buy signal for XAUUSD"
-  • "create trading recommendation"
-  • "consensus decision on GBPUSD"
-
-System Commands:
-  • "system status"
-  • "list agents"
-  • "memory status"
-
-  • "help"
-
-Features:
-  ✓ Vector memory integration
-  ✓ Auto-progression on triggers
-  ✓ Token-optimized responses
-  ✓ Multi-agent consensus
-  ✓ Session auto-save
-"""
-        )
+        return _HELP_TEXT
 
 
 __all__ = ["EnhancedLLMCLI"]
@@ -3,16 +3,20 @@ Enhanced XANFLOW Orchestrator with Journal Integration
 Manages ISPTS pipeline execution with comprehensive logging
 """
 
+import atexit
+import importlib.util
 import json
 import logging
 import os
 import queue
-from concurrent.futures import ThreadPoolExecutor
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 
-import requests
+import httpx
 
 from production.production_config import load_production_config
 
@@ -22,6 +26,25 @@ logger = logging.getLogger(__name__)
 CONFIG = load_production_config(os.environ.get("NCOS_CONFIG_PATH"))
 JOURNAL_API = CONFIG.api.journal
 
+# Pooled keep-alive client shared by every orchestrator; HTTP/2 when the
+# optional h2 package is installed
+_JOURNAL_CLIENT = httpx.Client(
+    http2=importlib.util.find_spec("h2") is not None,
+    timeout=httpx.Timeout(3.0, connect=1.0),
+    limits=httpx.Limits(max_keepalive_connections=8, max_connections=16),
+)
+atexit.register(_JOURNAL_CLIENT.close)
+
+# Endpoints parsed once; posting an absolute URL skips the per-request
+# parse and join against a base URL
+_URL_JOURNAL = httpx.URL(f"{JOURNAL_API}/journal")
+_URL_ANALYSIS = httpx.URL(f"{JOURNAL_API}/analysis")
+_URL_TRADES = httpx.URL(f"{JOURNAL_API}/trades")
+_URL_BATCH = httpx.URL(f"{JOURNAL_API}/journal/batch")
+
+# Journal posts allowed to wait for a worker before the oldest is dropped
+JOURNAL_MAX_PENDING = 1000
+
 
 @dataclass
 class PipelineStage:
@@ -34,6 +57,16 @@ class PipelineStage:
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
     error: Optional[str] = None
+    # time.perf_counter_ns() readings used for durations
+    start_ns: Optional[int] = None
+    end_ns: Optional[int] = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Seconds the stage ran, or None if it never finished"""
+        if self.start_ns is None or self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1e9
 
 
 class EnhancedXanflowOrchestrator:
@@ -44,6 +77,37 @@ class EnhancedXanflowOrchestrator:
         self.pipeline_queue = queue.Queue()
         self.results = {}
         self.journal_enabled = True
+        self._client = _JOURNAL_CLIENT
+        # Cleared once the journal API answers 404 to a batch post
+        self._batch_supported = True
+        # Futures of journal posts handed to the executor, oldest first
+        self._pending_logs = deque()
+        # Stage name -> implementation, looked up once per stage run
+        self._stage_impls = {
+            "market_analysis": self._stage_market_analysis,
+            "pattern_detection": self._stage_pattern_detection,
+            "risk_assessment": self._stage_risk_assessment,
+            "trade_decision": self._stage_trade_decision,
+            "execution_planning": self._stage_execution_planning
+        }
+
+    def _submit_journal(self, fn, *args):
+        """Run a journal post on the executor so the pipeline does not wait for it"""
+        pending = self._pending_logs
+        while pending and pending[0].done():
+            pending.popleft()
+        if len(pending) >= JOURNAL_MAX_PENDING:
+            # Log storm: drop the oldest queued post rather than grow without bound
+            if pending.popleft().cancel():
+                logger.warning("Journal backlog full, dropped the oldest pending entry")
+        pending.append(self.executor.submit(fn, *args))
+
+    def shutdown(self, wait_for_logs: bool = True):
+        """Stop the executor, by default after pending journal posts finish"""
+        if wait_for_logs:
+            wait(list(self._pending_logs))
+        self._pending_logs.clear()
+        self.executor.shutdown(wait=wait_for_logs)
 
     def _log_to_journal(self, entry_type: str, data: Dict[str, Any]):
         """Log pipeline events to journal"""
@@ -53,26 +117,71 @@ class EnhancedXanflowOrchestrator:
         try:
             if entry_type == "pipeline":
                 # Log as journal entry
-                journal_data = {
-                    "title": f"Pipeline Execution: {data.get('pipeline_id')}",
-                    "content": json.dumps(data, indent=2),
-                    "category": "pipeline_execution",
-                    "tags": ["pipeline", data.get("status", "unknown")]
-                }
-                requests.post(f"{JOURNAL_API}/journal", json=journal_data)
+                self._client.post(_URL_JOURNAL, json=self._pipeline_entry(data))
 
             elif entry_type == "stage":
                 # Log as analysis entry
-                analysis_data = {
-                    "symbol": data.get("symbol", "SYSTEM"),
-                    "analysis_type": "pipeline_stage",
-                    "content": data
-                }
-                requests.post(f"{JOURNAL_API}/analysis", json=analysis_data)
+                self._client.post(_URL_ANALYSIS, json=self._stage_entry(data))
 
         except Exception as e:
             logger.error(f"Failed to log to journal: {e}")
 
+    def _pipeline_entry(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Journal entry describing a whole pipeline execution"""
+        return {
+            "title": f"Pipeline Execution: {data.get('pipeline_id')}",
+            # Compact: the journal renders content itself, so indentation
+            # only added bytes on the wire
+            "content": json.dumps(data, separators=(",", ":")),
+            "category": "pipeline_execution",
+            "tags": ["pipeline", data.get("status", "unknown")]
+        }
+
+    def _stage_entry(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Analysis entry describing one pipeline stage"""
+        return {
+            "symbol": data.get("symbol", "SYSTEM"),
+            "analysis_type": "pipeline_stage",
+            "content": data
+        }
+
+    def _log_pipeline_batch(
+            self,
+            pipeline_context: Dict[str, Any],
+            stage_events: List[Dict[str, Any]],
+            trade_data: Optional[Dict[str, Any]]
+    ):
+        """Log a finished pipeline's stages, summary and trade in one request.
+
+        Falls back to one post per entry whenever the batch post does not
+        succeed, and stops trying the batch route once the journal API
+        shows it has none.
+        """
+        if self.journal_enabled and self._batch_supported:
+            batch = {
+                "pipeline": self._pipeline_entry(pipeline_context),
+                "stages": [self._stage_entry(data) for data in stage_events],
+                "trade": trade_data
+            }
+            try:
+                response = self._client.post(_URL_BATCH, json=batch)
+            except Exception as e:
+                logger.error(f"Failed to post journal batch: {e}")
+            else:
+                if response.is_success:
+                    return
+                if response.status_code in (404, 405):
+                    # Journal APIs without the batch route; stop trying it
+                    self._batch_supported = False
+                else:
+                    logger.error(f"Journal batch rejected with HTTP {response.status_code}")
+
+        for data in stage_events:
+            self._log_to_journal("stage", data)
+        self._log_to_journal("pipeline", pipeline_context)
+        if trade_data is not None:
+            self._post_trade(trade_data)
+
     def execute_ispts_pipeline(
             self,
             symbol: str,
@@ -83,7 +192,11 @@ class EnhancedXanflowOrchestrator:
         """
         Execute the ISPTS pipeline with comprehensive logging
         """
-        pipeline_id = f"pipeline_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        # Stages are timed with the monotonic counter; wall-clock times are
+        # derived from these two readings once the pipeline is done
+        started = datetime.now()
+        started_ns = time.perf_counter_ns()
+        pipeline_id = f"pipeline_{started.strftime('%Y%m%d_%H%M%S')}"
 
         # Initialize pipeline context
         pipeline_context = {
@@ -92,7 +205,7 @@ class EnhancedXanflowOrchestrator:
             "timeframe": timeframe,
             "session_id": session_id,
             "initial_context": initial_context,
-            "start_time": datetime.now().isoformat(),
+            "start_time": started.isoformat(),
             "stages": []
         }
 
@@ -105,10 +218,13 @@ class EnhancedXanflowOrchestrator:
             PipelineStage(name="execution_planning", agent="ExecutionPlanner", input_data={})
         ]
 
+        # Stage events, journaled together once the pipeline finishes
+        stage_events = []
+
         # Execute stages
         for i, stage in enumerate(stages):
             try:
-                stage.start_time = datetime.now()
+                stage.start_ns = time.perf_counter_ns()
                 stage.status = "running"
 
                 # Pass output from previous stage as input
@@ -119,23 +235,23 @@ class EnhancedXanflowOrchestrator:
                 stage.output_data = self._execute_stage(stage, pipeline_context)
 
                 stage.status = "completed"
-                stage.end_time = datetime.now()
+                stage.end_ns = time.perf_counter_ns()
 
                 # Log stage completion
                 stage_data = {
                     "pipeline_id": pipeline_id,
                     "stage": stage.name,
                     "status": stage.status,
-                    "duration": (stage.end_time - stage.start_time).total_seconds(),
+                    "duration": stage.duration,
                     "symbol": symbol,
                     "session_id": session_id
                 }
-                self._log_to_journal("stage", stage_data)
+                stage_events.append(stage_data)
 
             except Exception as e:
                 stage.status = "failed"
                 stage.error = str(e)
-                stage.end_time = datetime.now()
+                stage.end_ns = time.perf_counter_ns()
                 logger.error(f"Stage {stage.name} failed: {e}")
 
                 # Log stage failure
@@ -147,20 +263,28 @@ class EnhancedXanflowOrchestrator:
                     "symbol": symbol,
                     "session_id": session_id
                 }
-                self._log_to_journal("stage", stage_data)
+                stage_events.append(stage_data)
                 break
 
+        for stage in stages:
+            if stage.start_ns is not None:
+                stage.start_time = started + timedelta(microseconds=(stage.start_ns - started_ns) / 1000)
+            if stage.end_ns is not None:
+                stage.end_time = started + timedelta(microseconds=(stage.end_ns - started_ns) / 1000)
+
         # Compile pipeline results
         pipeline_context["stages"] = [
             {
                 "name": s.name,
                 "status": s.status,
-                "duration": (s.end_time - s.start_time).total_seconds() if s.end_time and s.start_time else None,
+                "duration": s.duration,
                 "error": s.error
             }
             for s in stages
         ]
-        pipeline_context["end_time"] = datetime.now().isoformat()
+        pipeline_context["end_time"] = (
+            started + timedelta(microseconds=(time.perf_counter_ns() - started_ns) / 1000)
+        ).isoformat()
         pipeline_context["status"] = "completed" if all(s.status == "completed" for s in stages) else "failed"
 
         # Generate final output
@@ -173,53 +297,57 @@ class EnhancedXanflowOrchestrator:
             "execution_context": self._build_execution_context(stages)
         }
 
-        # Log complete pipeline execution
-        self._log_to_journal("pipeline", pipeline_context)
-
-        # If trade decision was made, log it separately
+        # Log stages, the complete pipeline execution and any trade decision
+        trade_data = None
         if final_output["trade_decision"] and final_output["trade_decision"].get("execute_trade"):
-            self._log_trade_decision(final_output["trade_decision"], session_id, pipeline_id)
+            trade_data = self._trade_entry(final_output["trade_decision"], session_id, pipeline_id)
+        self._submit_journal(self._log_pipeline_batch, pipeline_context, stage_events, trade_data)
 
         return final_output
 
     def _execute_stage(self, stage: PipelineStage, context: Dict[str, Any]) -> Dict[str, Any]:
         """Execute a single pipeline stage"""
-        # Placeholder for actual agent execution
-        # In production, this would call the appropriate agent
-
-        if stage.name == "market_analysis":
-            return {
-                "market_bias": "bullish",
-                "key_levels": [2650, 2655, 2660],
-                "volatility": "medium"
-            }
-        elif stage.name == "pattern_detection":
-            return {
-                "patterns": ["Wyckoff Spring", "Order Block"],
-                "confidence": 0.85
-            }
-        elif stage.name == "risk_assessment":
-            return {
-                "risk_score": 0.3,
-                "position_size": 0.02,
-                "stop_loss": 2645,
-                "take_profit": 2665
-            }
-        elif stage.name == "trade_decision":
-            return {
-                "execute_trade": True,
-                "direction": "long",
-                "entry_price": 2650.50,
-                "reasoning": "Strong bullish setup with favorable risk/reward"
-            }
-        elif stage.name == "execution_planning":
-            return {
-                "execution_type": "limit",
-                "entry_zones": [2650.00, 2650.50],
-                "scaling_plan": "single_entry"
-            }
+        impl = self._stage_impls.get(stage.name)
+        return impl(stage, context) if impl else {}
+
+    # Placeholders for actual agent execution
+    # In production, these would call the appropriate agent
 
-        return {}
+    def _stage_market_analysis(self, stage: PipelineStage, context: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "market_bias": "bullish",
+            "key_levels": [2650, 2655, 2660],
+            "volatility": "medium"
+        }
+
+    def _stage_pattern_detection(self, stage: PipelineStage, context: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "patterns": ["Wyckoff Spring", "Order Block"],
+            "confidence": 0.85
+        }
+
+    def _stage_risk_assessment(self, stage: PipelineStage, context: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "risk_score": 0.3,
+            "position_size": 0.02,
+            "stop_loss": 2645,
+            "take_profit": 2665
+        }
+
+    def _stage_trade_decision(self, stage: PipelineStage, context: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "execute_trade": True,
+            "direction": "long",
+            "entry_price": 2650.50,
+            "reasoning": "Strong bullish setup with favorable risk/reward"
+        }
+
+    def _stage_execution_planning(self, stage: PipelineStage, context: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "execution_type": "limit",
+            "entry_zones": [2650.00, 2650.50],
+            "scaling_plan": "single_entry"
+        }
 
     def _build_execution_context(self, stages: List[PipelineStage]) -> Dict[str, Any]:
         """Build comprehensive execution context from all stages"""
@@ -233,7 +361,11 @@ class EnhancedXanflowOrchestrator:
 
     def _log_trade_decision(self, decision: Dict[str, Any], session_id: str, pipeline_id: str):
         """Log trade decision as a trade entry"""
-        trade_data = {
+        self._post_trade(self._trade_entry(decision, session_id, pipeline_id))
+
+    def _trade_entry(self, decision: Dict[str, Any], session_id: str, pipeline_id: str) -> Dict[str, Any]:
+        """Trade entry for a trade decision"""
+        return {
             "symbol": decision.get("symbol", "UNKNOWN"),
             "side": decision.get("direction", "unknown"),
             "entry_price": decision.get("entry_price", 0),
@@ -245,8 +377,10 @@ class EnhancedXanflowOrchestrator:
             "trace_id": pipeline_id
         }
 
+    def _post_trade(self, trade_data: Dict[str, Any]):
+        """Post a trade entry to the journal API"""
         try:
-            requests.post(f"{JOURNAL_API}/trades", json=trade_data)
+            self._client.post(_URL_TRADES, json=trade_data)
         except Exception as e:
             logger.error(f"Failed to log trade decision: {e}")
 
@@ -266,3 +400,4 @@ if __name__ == "__main__":
     )
 
     print(f"Pipeline Result: {json.dumps(result, indent=2)}")
+    orchestrator.shutdown()
@@ -4,6 +4,8 @@ Enriches market data with additional calculated features and indicators
 """
 
 import logging
+import math
+from collections import deque
 from typing import Dict, Any, Optional, Tuple
 
 import numpy as np
@@ -14,33 +16,35 @@ from ncos_predictive_schemas import DataEnricherConfig, SpreadTrackerConfig
 
 logger = logging.getLogger(__name__)
 
+# Volume ratio of 3x maps to a full tick density score
+_LOG1P_3 = math.log1p(3)
+
 
 class SpreadTracker:
     """Tracks spread behavior and calculates stability metrics."""
 
     def __init__(self, config: SpreadTrackerConfig):
         self.config = config
-        self.spread_buffer = []
+        self.spread_buffer = deque(maxlen=config.window_size)
         self.max_buffer_size = config.window_size
+        # Running mean and sum of squared deviations of the window
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._m2_peak = 0.0
+        self._pushes_since_resync = 0
         logger.info(f"SpreadTracker initialized with window size: {config.window_size}")
 
     def update(self, spread: float) -> Dict[str, float]:
         """Update spread buffer and return stability metrics."""
-        self.spread_buffer.append(spread)
-
-        # Maintain buffer size
-        if len(self.spread_buffer) > self.max_buffer_size:
-            self.spread_buffer.pop(0)
+        self._push(spread)
 
         # Calculate metrics
         if len(self.spread_buffer) < 5:
             return {"stability_score": 0.5, "normalized_spread": spread}
 
-        spreads = np.array(self.spread_buffer)
-
         # Calculate stability score
-        mean_spread = np.mean(spreads)
-        std_spread = np.std(spreads)
+        mean_spread = self._mean
+        std_spread = math.sqrt(max(self._m2, 0.0) / len(self.spread_buffer))
         cv = std_spread / mean_spread if mean_spread > 0 else 0
 
         # Stability score (inverse of coefficient of variation)
@@ -57,6 +61,45 @@ class SpreadTracker:
             "is_stable": stability_score >= self.config.stability_threshold
         }
 
+    def _push(self, spread: float) -> None:
+        """Add spread to the window, keeping its mean and squared deviations current."""
+        buffer = self.spread_buffer
+        if len(buffer) == buffer.maxlen:
+            # Sliding Welford step: swap the oldest spread for the new one
+            oldest = buffer[0]
+            buffer.append(spread)
+            delta = spread - oldest
+            mean = self._mean + delta / len(buffer)
+            self._m2 += delta * (spread - mean + oldest - self._mean)
+            self._mean = mean
+        else:
+            buffer.append(spread)
+            delta = spread - self._mean
+            self._mean += delta / len(buffer)
+            self._m2 += delta * (spread - self._mean)
+
+        # Recompute exactly once per window to shed accumulated rounding,
+        # when the deviations collapse far below their peak (an outlier left
+        # the window and cancellation ate the precision), and whenever a
+        # non-finite spread has poisoned the running values
+        self._pushes_since_resync += 1
+        self._m2_peak = max(self._m2_peak, self._m2)
+        if (
+            self._pushes_since_resync >= len(buffer)
+            or self._m2 < self._m2_peak * 1e-6
+            or not math.isfinite(self._m2)
+        ):
+            self._resync()
+
+    def _resync(self) -> None:
+        """Recompute the window mean and squared deviations from scratch."""
+        buffer = self.spread_buffer
+        mean = math.fsum(buffer) / len(buffer)
+        self._mean = mean
+        self._m2 = math.fsum((x - mean) * (x - mean) for x in buffer)
+        self._m2_peak = self._m2
+        self._pushes_since_resync = 0
+
 
 class DataEnricher:
     """
@@ -123,50 +166,97 @@ class DataEnricher:
         if not self.config.enabled:
             return data
 
-        enriched_data = data.copy()
+        # Shallow copy: the new columns land on the copy only, while the
+        # existing columns keep sharing their data with the caller's frame
+        enriched_data = data.copy(deep=False)
+
+        # One contiguous float64 view of close for every TA-Lib call
+        if len(data) >= 14:
+            close = np.ascontiguousarray(data['close'], dtype=np.float64)
+            # Bollinger middle band is the 20-bar SMA, so sma_20 reuses it
+            # instead of making another pass over close
+            bb_upper, bb_middle, bb_lower = talib.BBANDS(close, timeperiod=20, nbdevup=2, nbdevdn=2)
 
         # Add moving averages
         if len(data) >= 50:
-            enriched_data['sma_20'] = talib.SMA(data['close'], timeperiod=20)
-            enriched_data['sma_50'] = talib.SMA(data['close'], timeperiod=50)
-            enriched_data['ema_20'] = talib.EMA(data['close'], timeperiod=20)
+            enriched_data['sma_20'] = bb_middle
+            enriched_data['sma_50'] = talib.SMA(close, timeperiod=50)
+            enriched_data['ema_20'] = talib.EMA(close, timeperiod=20)
 
         # Add volatility indicators
         if len(data) >= 14:
-            enriched_data['atr_14'] = talib.ATR(data['high'], data['low'], data['close'], timeperiod=14)
-            enriched_data['bb_upper'], enriched_data['bb_middle'], enriched_data['bb_lower'] = talib.BBANDS(
-                data['close'], timeperiod=20, nbdevup=2, nbdevdn=2
+            high = np.ascontiguousarray(data['high'], dtype=np.float64)
+            low = np.ascontiguousarray(data['low'], dtype=np.float64)
+            enriched_data['atr_14'] = talib.ATR(high, low, close, timeperiod=14)
+            enriched_data['bb_upper'], enriched_data['bb_middle'], enriched_data['bb_lower'] = (
+                bb_upper, bb_middle, bb_lower
             )
 
         # Add momentum indicators
         if len(data) >= 14:
-            enriched_data['rsi_14'] = talib.RSI(data['close'], timeperiod=14)
+            enriched_data['rsi_14'] = talib.RSI(close, timeperiod=14)
             enriched_data['macd'], enriched_data['macd_signal'], enriched_data['macd_hist'] = talib.MACD(
-                data['close'], fastperiod=12, slowperiod=26, signalperiod=9
+                close, fastperiod=12, slowperiod=26, signalperiod=9
             )
 
         # Add volume indicators
         if 'volume' in data.columns:
-            enriched_data['volume_sma'] = talib.SMA(data['volume'], timeperiod=20)
+            volume = np.ascontiguousarray(data['volume'], dtype=np.float64)
+            enriched_data['volume_sma'] = talib.SMA(volume, timeperiod=20)
             enriched_data['volume_ratio'] = data['volume'] / enriched_data['volume_sma']
 
         logger.info(f"Enriched dataframe with {len(enriched_data.columns) - len(data.columns)} new features")
 
         return enriched_data
 
+    def enrich_dataframe_htf(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Add the HTF alignment indicators for every bar of a dataframe at once.
+
+        Row i gets what _calculate_htf_alignment_indicators returns for the
+        close at i against the history up to and including i. Rows before the
+        50th are NaN, matching the 50-bar minimum of enrich_bar_data.
+        """
+        closes = data['close'].astype(np.float64)
+        close = closes.to_numpy()
+        sma_20 = closes.rolling(20).mean().to_numpy()
+        sma_50 = closes.rolling(50).mean().to_numpy()
+        sma_100 = closes.rolling(100).mean().to_numpy()
+        # Fewer than 100 bars of history fall back to the 50-bar SMA
+        sma_100[:99] = sma_50[:99]
+
+        # Perfect alignment scores 3/3 on one side, so max(bull, bear) / 3
+        # covers both branches of the per-bar function
+        bullish = (close > sma_20).astype(np.int8) + (sma_20 > sma_50) + (sma_50 > sma_100)
+        bearish = (close < sma_20).astype(np.int8) + (sma_20 < sma_50) + (sma_50 < sma_100)
+        alignment_score = np.maximum(bullish, bearish) / 3.0
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            trend_strength = np.where(sma_50 > 0, np.abs(sma_20 - sma_50) / sma_50, 0.0)
+            position_vs_sma20 = np.where(sma_20 > 0, (close - sma_20) / sma_20, 0.0)
+
+        warm = np.arange(len(close)) >= 49
+        enriched = data.copy(deep=False)
+        enriched['htf_alignment_score'] = np.where(warm, alignment_score, np.nan)
+        enriched['htf_trend_strength'] = np.where(warm, np.minimum(trend_strength * 10, 1.0), np.nan)
+        enriched['htf_position_vs_sma20'] = np.where(warm, position_vs_sma20, np.nan)
+        return enriched
+
     def _calculate_htf_alignment_indicators(
             self,
             current_bar: pd.Series,
             historical_data: pd.DataFrame
     ) -> Dict[str, float]:
         """Calculate indicators for higher timeframe alignment."""
-        close_prices = historical_data['close']
+        # Only the last SMA value is needed, so average the tail directly
+        # instead of building full rolling-mean series
+        close_prices = historical_data['close'].to_numpy(dtype=np.float64)
         current_close = current_bar['close']
 
         # Multiple timeframe SMAs
-        sma_20 = close_prices.rolling(20).mean().iloc[-1]
-        sma_50 = close_prices.rolling(50).mean().iloc[-1]
-        sma_100 = close_prices.rolling(100).mean().iloc[-1] if len(close_prices) >= 100 else sma_50
+        sma_20 = close_prices[-20:].mean()
+        sma_50 = close_prices[-50:].mean()
+        sma_100 = close_prices[-100:].mean() if len(close_prices) >= 100 else sma_50
 
         # Alignment scores
         alignment_score = 0.0
@@ -198,14 +288,16 @@ class DataEnricher:
         if 'volume' not in historical_data.columns:
             return {"score": 0.5, "ratio": 1.0}
 
-        recent_volumes = historical_data['volume'].tail(20)
-        avg_volume = recent_volumes.mean()
+        recent_volumes = historical_data['volume'].to_numpy(dtype=np.float64)[-20:]
+        # Mean over the non-missing volumes, like Series.mean()
+        valid_volumes = recent_volumes[~np.isnan(recent_volumes)]
+        avg_volume = valid_volumes.mean() if len(valid_volumes) else np.nan
         current_volume = current_bar['volume']
 
         if avg_volume > 0:
             volume_ratio = current_volume / avg_volume
             # Convert to score with logarithmic scaling
-            score = min(np.log1p(volume_ratio) / np.log1p(3), 1.0)
+            score = min(math.log1p(max(volume_ratio, 0.0)) / _LOG1P_3, 1.0)
         else:
             volume_ratio = 1.0
             score = 0.5
@@ -213,7 +305,10 @@ class DataEnricher:
         return {
             "score": score,
             "ratio": volume_ratio,
-            "percentile": (recent_volumes < current_volume).sum() / len(recent_volumes)
+            "percentile": (
+                np.count_nonzero(recent_volumes < current_volume) / len(recent_volumes)
+                if len(recent_volumes) else np.nan
+            )
         }
 
     def _calculate_technical_features(
@@ -226,22 +321,32 @@ class DataEnricher:
 
         # Price position within Bollinger Bands
         if all(col in historical_data.columns for col in ['close']):
-            close_prices = historical_data['close'].values
-            upper, middle, lower = talib.BBANDS(close_prices, timeperiod=20)
-
-            if not np.isnan(upper[-1]) and upper[-1] != lower[-1]:
-                bb_position = (current_bar['close'] - lower[-1]) / (upper[-1] - lower[-1])
+            upper = lower = np.nan
+            if 'bb_upper' in historical_data.columns and 'bb_lower' in historical_data.columns:
+                # Reuse the bands enrich_dataframe already computed
+                upper = historical_data['bb_upper'].iloc[-1]
+                lower = historical_data['bb_lower'].iloc[-1]
+            if np.isnan(upper) or np.isnan(lower):
+                # The latest band depends only on the last 20 closes
+                close_prices = np.ascontiguousarray(historical_data['close'].values[-20:], dtype=np.float64)
+                bands_upper, _, bands_lower = talib.BBANDS(close_prices, timeperiod=20)
+                upper, lower = bands_upper[-1], bands_lower[-1]
+
+            if not np.isnan(upper) and upper != lower:
+                bb_position = (current_bar['close'] - lower) / (upper - lower)
                 features['bb_position'] = max(0, min(1, bb_position))
 
         # RSI divergence potential
         if 'rsi_14' in historical_data.columns:
-            recent_rsi = historical_data['rsi_14'].tail(5)
-            recent_close = historical_data['close'].tail(5)
+            # Work on the raw array tails; this runs once per bar and
+            # building Series for five values costs more than the check
+            recent_rsi = historical_data['rsi_14'].to_numpy(dtype=np.float64)[-5:]
+            recent_close = historical_data['close'].to_numpy(dtype=np.float64)[-5:]
 
-            if len(recent_rsi) == 5 and not recent_rsi.isna().any():
+            if len(recent_rsi) == 5 and not np.isnan(recent_rsi).any():
                 # Simple divergence check
-                price_trend = 1 if recent_close.iloc[-1] > recent_close.iloc[0] else -1
-                rsi_trend = 1 if recent_rsi.iloc[-1] > recent_rsi.iloc[0] else -1
+                price_trend = 1 if recent_close[-1] > recent_close[0] else -1
+                rsi_trend = 1 if recent_rsi[-1] > recent_rsi[0] else -1
 
                 features['divergence_potential'] = 1.0 if price_trend != rsi_trend else 0.0
 
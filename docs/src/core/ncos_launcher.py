@@ -5,27 +5,44 @@ Handles path setup and launches the system from any directory
 """
 
 import argparse
+import functools
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 import yaml
 
+# libyaml-backed loader when PyYAML was built with it
+CLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# Threads used to read and parse config files during validation
+CONFIG_LOAD_WORKERS = 8
+
 # Fast mode toggle
 FAST_MODE = os.getenv("NCOS_FAST_MODE", "0") == "1"
 from pathlib import Path
 
 
+def _entry_names(directory):
+    """Names of everything in a directory, from one listing instead of a stat per name"""
+    try:
+        with os.scandir(directory) as entries:
+            return {entry.name for entry in entries}
+    except OSError:
+        return set()
+
+
 def find_ncos_root():
     """Find the NCOS root directory"""
     # Check if we're already in the right place
     current = Path.cwd()
 
     # Look for key directories
-    if (current / "agents").exists() and (current / "config").exists():
+    if {"agents", "config"} <= _entry_names(current):
         return current
 
     # Check if we're in scripts directory
-    if current.name == "scripts" and (current.parent / "agents").exists():
+    if current.name == "scripts" and "agents" in _entry_names(current.parent):
         return current.parent
 
     # Check common locations
@@ -37,7 +54,8 @@ def find_ncos_root():
     ]
 
     for path in possible_paths:
-        if path.exists() and (path / "agents").exists():
+        # agents can only exist if path does, so one stat answers both
+        if os.path.exists(path / "agents"):
             return path
 
     return None
@@ -63,21 +81,40 @@ def setup_environment(ncos_root):
     return True
 
 
+@functools.lru_cache(maxsize=None)
+def _load_yaml(path):
+    """Parse a YAML file once per absolute path; later checks reuse the result"""
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=CLoader)
+
+
 def validate_all_configs():
     """Validate YAML config files."""
-    config_dir = Path('config')
-    for cfg in config_dir.glob('*.yaml'):
-        with open(cfg, 'r') as f:
-            yaml.safe_load(f)
+    if not os.path.isdir('config'):
+        return
+    with os.scandir(os.path.abspath('config')) as entries:
+        paths = [entry.path for entry in entries if entry.name.endswith('.yaml') and entry.is_file()]
+    if not paths:
+        return
+    # Files are independent, so read them concurrently; consuming the
+    # results re-raises the first invalid file's error as before
+    with ThreadPoolExecutor(max_workers=min(CONFIG_LOAD_WORKERS, len(paths))) as pool:
+        list(pool.map(_load_yaml, paths))
+
+
+def _load_registry():
+    """Parsed config/agent_registry.yaml, or None if it is missing."""
+    registry_path = os.path.abspath(os.path.join('config', 'agent_registry.yaml'))
+    if not os.path.exists(registry_path):
+        return None
+    return _load_yaml(registry_path) or {}
 
 
 def register_agents():
     """Ensure agents in registry can be imported."""
-    registry_path = Path('config') / 'agent_registry.yaml'
-    if not registry_path.exists():
+    registry = _load_registry()
+    if registry is None:
         return
-    with open(registry_path, 'r') as f:
-        registry = yaml.safe_load(f) or {}
     for agent, data in registry.get('agents', {}).items():
         module_name = data.get('module')
         if module_name:
@@ -86,18 +123,18 @@ def register_agents():
 
 def verify_schema_mapping():
     """Verify each agent has a corresponding config file."""
-    registry_path = Path('config') / 'agent_registry.yaml'
-    if not registry_path.exists():
+    registry = _load_registry()
+    if registry is None:
         print("⚠️  Warning: agent_registry.yaml not found, cannot verify schema mapping")
         return
-    with open(registry_path, 'r') as f:
-        registry = yaml.safe_load(f) or {}
+    existing = _entry_names('config')
     missing = []
     # Validate config files for both core and strategy agents
     for section in ("agents", "strategy_agents"):
         for agent in registry.get(section, {}):
-            cfg_path = Path('config') / f"{agent.lower()}_config.yaml"
-            if not cfg_path.exists():
+            cfg_name = f"{agent.lower()}_config.yaml"
+            if cfg_name not in existing:
+                cfg_path = Path('config') / cfg_name
                 print(
                     f"⚠️  Warning: Config file for '{agent}' not found at {cfg_path}"
                 )
@@ -6,6 +6,9 @@ import functools
 import json
 import logging
 import os
+import random
+import tempfile
+import time
 import traceback
 from datetime import datetime
 from enum import Enum
@@ -14,9 +17,23 @@ from typing import Any, Callable, Optional, Dict
 
 # Configure structured logging
 class StructuredFormatter(logging.Formatter):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # (second, "YYYY-MM-DDTHH:MM:SS") of the last record formatted
+        self._second = (None, "")
+
+    def _timestamp(self, created: float) -> str:
+        """UTC ISO timestamp of a record, formatting the date part once per second"""
+        sec = int(created)
+        cached_sec, prefix = self._second
+        if sec != cached_sec:
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec))
+            self._second = (sec, prefix)
+        return f"{prefix}.{int((created - sec) * 1_000_000):06d}"
+
     def format(self, record):
         log_obj = {
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': self._timestamp(record.created),
             'level': record.levelname,
             'logger': record.name,
             'message': record.getMessage(),
@@ -86,27 +103,58 @@ class ResourceError(NCOSError):
         self.current = current
 
 
+# Errors that would fail the same way on every attempt, so are never retried
+_NON_RETRYABLE = (ValidationError, ConfigurationError)
+
+# Upper bound on the sleep between two retries, in seconds
+MAX_RETRY_DELAY = 30.0
+
+# Components whose logger already has the structured handlers attached
+_configured_components = set()
+
+
+@functools.lru_cache(maxsize=None)
+def _log_dir() -> Optional[str]:
+    """Create the log directory on first use, falling back to a temp dir; None if neither is usable"""
+    for log_dir in (os.environ.get("NCOS_LOG_DIR", "/var/log/ncOS"),
+                    os.path.join(tempfile.gettempdir(), "ncOS")):
+        try:
+            os.makedirs(log_dir, exist_ok=True)
+            return log_dir
+        except OSError:
+            continue
+    return None
+
+
 def setup_logging(component_name: str, log_level: str = "INFO") -> logging.Logger:
     """Set up structured logging for a component"""
     logger = logging.getLogger(component_name)
     logger.setLevel(getattr(logging, log_level))
+    if component_name in _configured_components:
+        return logger
 
     # Console handler with structured output
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(StructuredFormatter())
     logger.addHandler(console_handler)
 
-    # File handler
-    log_dir = "/var/log/ncOS"
-    os.makedirs(log_dir, exist_ok=True)
-
-    file_handler = logging.FileHandler(f"{log_dir}/{component_name}.json")
-    file_handler.setFormatter(StructuredFormatter())
-    logger.addHandler(file_handler)
+    # File handler, skipped when no log directory could be created
+    log_dir = _log_dir()
+    if log_dir is not None:
+        file_handler = logging.FileHandler(f"{log_dir}/{component_name}.json")
+        file_handler.setFormatter(StructuredFormatter())
+        logger.addHandler(file_handler)
 
+    _configured_components.add(component_name)
     return logger
 
 
+@functools.lru_cache(maxsize=None)
+def _component_logger(component: str) -> logging.Logger:
+    """Logger set up once per component for the decorators below"""
+    return setup_logging(component)
+
+
 def with_error_handling(
         component: str,
         max_retries: int = 3,
@@ -118,7 +166,7 @@ def with_error_handling(
     def decorator(func: Callable) -> Callable:
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            logger = setup_logging(component)
+            logger = _component_logger(component)
             attempt = 0
             last_error = None
 
@@ -157,6 +205,10 @@ def with_error_handling(
                         }},
                         exc_info=True
                     )
+                    if isinstance(e, _NON_RETRYABLE):
+                        if propagate:
+                            raise
+                        return None
 
                 except Exception as e:
                     last_error = e
@@ -171,8 +223,10 @@ def with_error_handling(
 
                 attempt += 1
                 if attempt < max_retries:
-                    import time
-                    time.sleep(retry_delay * attempt)  # Exponential backoff
+                    # Exponential backoff with a little jitter so callers
+                    # failing together do not retry in lockstep
+                    delay = min(retry_delay * 2 ** (attempt - 1), MAX_RETRY_DELAY)
+                    time.sleep(delay + random.uniform(0, 0.1 * retry_delay))
 
             # All retries exhausted
             logger.critical(
@@ -199,7 +253,7 @@ def log_performance(component: str) -> Callable:
     def decorator(func: Callable) -> Callable:
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            logger = setup_logging(component)
+            logger = _component_logger(component)
             start_time = datetime.utcnow()
 
             try:
@@ -257,34 +311,49 @@ class ErrorAggregator:
 
     def __init__(self, component: str):
         self.component = component
-        self.errors = []
+        # Collected errors, one list per field; rows are built on demand
+        self._ts = []
+        self._msg = []
+        self._type = []
+        self._ctx = []
         self.logger = setup_logging(component)
 
+    @property
+    def errors(self) -> list:
+        """Collected errors as dicts with timestamp, error, type and context"""
+        return [
+            {
+                'timestamp': datetime.utcfromtimestamp(ts).isoformat(),
+                'error': msg,
+                'type': error_type,
+                'context': context
+            }
+            for ts, msg, error_type, context in zip(self._ts, self._msg, self._type, self._ctx)
+        ]
+
     def add_error(self, error: Exception, context: Dict):
         """Add an error to the aggregator"""
-        self.errors.append({
-            'timestamp': datetime.utcnow().isoformat(),
-            'error': str(error),
-            'type': type(error).__name__,
-            'context': context
-        })
+        self._ts.append(time.time())
+        self._msg.append(str(error))
+        self._type.append(type(error).__name__)
+        self._ctx.append(context)
 
     def log_summary(self):
         """Log a summary of all collected errors"""
-        if self.errors:
+        if self._msg:
             self.logger.error(
                 f"Error summary for {self.component}",
                 extra={'extra_fields': {
-                    'error_count': len(self.errors),
+                    'error_count': len(self._msg),
                     'errors': self.errors
                 }}
             )
 
     def raise_if_errors(self):
         """Raise an exception if any errors were collected"""
-        if self.errors:
+        if self._msg:
             raise NCOSError(
-                f"Batch operation failed with {len(self.errors)} errors",
+                f"Batch operation failed with {len(self._msg)} errors",
                 ErrorCategory.RUNTIME,
                 {'errors': self.errors}
             )
@@ -0,0 +1,101 @@
+import importlib
+import importlib.util
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+CORE_DIR = Path(__file__).resolve().parents[1] / "docs" / "src" / "core"
+
+
+def _load(name):
+    # conftest stubs yaml out; the consolidators subclass its real loaders
+    stub = sys.modules.pop("yaml", None)
+    try:
+        real_yaml = importlib.import_module("yaml")
+    finally:
+        if stub is not None:
+            sys.modules["yaml"] = stub
+    spec = importlib.util.spec_from_file_location(name, CORE_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    saved = sys.modules.get("yaml")
+    sys.modules["yaml"] = real_yaml
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        sys.modules["yaml"] = saved
+    return module
+
+
+clean = _load("consolidate_configs_clean")
+
+
+@pytest.fixture
+def load_ini(tmp_path):
+    consolidator = clean.ConfigurationConsolidator(str(tmp_path))
+
+    def load(text, suffix=".ini"):
+        path = tmp_path / f"sample{suffix}"
+        path.write_text(text)
+        return consolidator.load_config_file(path)
+
+    return load
+
+
+def test_ini_keys_before_first_section_go_to_default(load_ini):
+    assert load_ini("a = 1\n[db]\nhost = x\n") == {"default": {"a": "1"}, "db": {"host": "x"}}
+
+
+def test_ini_hash_lines_are_comments(load_ini):
+    text = "# a = 1\n[s]\n  # b = 2\nc = 3\n; d = 4\n"
+    # Only '#' starts a comment; ';' lines are ordinary keys
+    assert load_ini(text) == {"s": {"c": "3", "; d": "4"}}
+
+
+def test_ini_repeated_section_starts_over(load_ini):
+    assert load_ini("[s]\na = 1\n[t]\nb = 2\n[s]\nc = 3\n") == {"s": {"c": "3"}, "t": {"b": "2"}}
+
+
+def test_ini_lines_without_value_are_ignored(load_ini):
+    text = "a = 1\nupstream {\n    b = 2\n}\nflag\nempty =\n"
+    assert load_ini(text, ".conf") == {"default": {"a": "1", "b": "2", "empty": ""}}
+
+
+def test_ini_value_keeps_later_equals_signs(load_ini):
+    assert load_ini("[s]\nurl = a=b=c\n", ".cfg") == {"s": {"url": "a=b=c"}}
+
+
+robust = _load("consolidate_configs_robust")
+
+SKIP_SAMPLE_PATHS = [
+    "/p/.git/config.json", "/p/x.git/a.yaml", "/p/.github/ci.yml", "/p/__pycache__/m.json",
+    "/p/mod.pyc", "/p/mod.pyc.json", "/p/pkg.egg-info/PKG.json", "/p/pkgegg-info/a.json",
+    "/p/backup_old/a.yaml", "/p/.DS_Store", "/p/xDS_Store.json", "/p/a.b/c.json", "/p/clean/config.yaml",
+]
+
+
+def _skips(literals, regex, path):
+    return any(lit in path for lit in literals) or (regex is not None and regex.search(path) is not None)
+
+
+def test_skip_patterns_split_into_literals_and_regex():
+    literals, regex = robust._split_skip_patterns(robust.RobustConfigConsolidator().skip_patterns)
+    assert literals == (".git/", "__pycache__", ".egg-info", "backup", ".DS_Store")
+    assert regex.pattern == r"\.pyc$"
+
+
+@pytest.mark.parametrize("patterns", [
+    robust.RobustConfigConsolidator().skip_patterns,
+    [r"a\.b", r"\\", "plain"],
+    ["plain", r"\.DS_Store"],
+])
+def test_split_skip_patterns_match_like_re_search(patterns):
+    literals, regex = robust._split_skip_patterns(patterns)
+    for path in SKIP_SAMPLE_PATHS + ["/p/back\\slash.json", "/p/plainly.yaml"]:
+        expected = any(re.search(pattern, path) for pattern in patterns)
+        assert _skips(literals, regex, path) == expected, path
+
+
+def test_split_skip_patterns_without_regexes():
+    assert robust._split_skip_patterns(["a", r"b\.c"]) == (("a", "b.c"), None)
@@ -0,0 +1,173 @@
+import asyncio
+import importlib
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+ORCHESTRATOR_PATH = Path(__file__).resolve().parents[1] / "docs" / "src" / "core" / "core_enhanced_master_orchestrator.py"
+
+
+def _load_orchestrator():
+    # conftest stubs yaml out; the orchestrator needs the real parser
+    stub = sys.modules.pop("yaml", None)
+    try:
+        real_yaml = importlib.import_module("yaml")
+    finally:
+        if stub is not None:
+            sys.modules["yaml"] = stub
+    spec = importlib.util.spec_from_file_location("core_enhanced_master_orchestrator", ORCHESTRATOR_PATH)
+    module = importlib.util.module_from_spec(spec)
+    saved = sys.modules.get("yaml")
+    sys.modules["yaml"] = real_yaml
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        sys.modules["yaml"] = saved
+    return module
+
+
+orchestrator = _load_orchestrator()
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def _journal_lines(workdir):
+    path = workdir / "logs" / "trade_journal.jsonl"
+    if not path.exists():
+        return []
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_sync_appends_flush_after_event_loop_exits(workdir):
+    orch = orchestrator.MasterOrchestrator()
+
+    async def mark():
+        return orch.route_command("mark gold bullish H4")
+
+    # The loop closes before its delayed flush fires
+    asyncio.run(mark())
+    orch._append_to_journal({"type": "note", "session_id": "s1"})
+    orch._append_to_journal({"type": "note", "session_id": "s1"})
+
+    assert orch._journal_buf == []
+    assert orch._journal_flush_handle is None
+    assert len(_journal_lines(workdir)) == 3
+
+
+def test_appends_in_running_loop_flush_on_timer(workdir, monkeypatch):
+    monkeypatch.setattr(orchestrator, "JOURNAL_FLUSH_INTERVAL", 0.01)
+    orch = orchestrator.MasterOrchestrator()
+
+    async def mark_twice():
+        orch.route_command("mark gold bullish H4")
+        orch.route_command("mark eurusd bearish M15")
+        buffered = len(orch._journal_buf)
+        await asyncio.sleep(0.05)
+        return buffered
+
+    assert asyncio.run(mark_twice()) == 2
+    assert orch._journal_buf == []
+    assert len(_journal_lines(workdir)) == 2
+
+
+def _recap(orch):
+    recap = orch._session_recap()
+    recap["symbols"] = sorted(recap["symbols"])
+    return recap
+
+
+def _line(session_id, symbol):
+    return json.dumps({"type": "voice_tag", "symbol": symbol, "session_id": session_id}) + "\n"
+
+
+def test_index_rebuilds_after_external_truncate_and_append(workdir):
+    orch = orchestrator.MasterOrchestrator()
+    orch.state["session_id"] = "s1"
+    for prompt in ("mark gold bullish", "mark btcusd bearish", "mark eurusd neutral"):
+        orch.route_command(prompt)
+    assert _recap(orch)["total_entries"] == 3
+
+    journal = workdir / "logs" / "trade_journal.jsonl"
+    journal.write_text(_line("s1", "XAUUSD"))
+    assert _recap(orch) == {"session_id": "s1", "total_entries": 1, "trades_analyzed": 0,
+                            "voice_tags": 1, "symbols": ["XAUUSD"]}
+
+    with open(journal, "a") as f:
+        f.write(_line("s2", "BTCUSD") + _line("s1", "EURUSD"))
+    assert _recap(orch)["symbols"] == ["EURUSD", "XAUUSD"]
+
+    # The on-disk index was rewritten to match, so a new reader agrees
+    fresh = orchestrator.MasterOrchestrator()
+    fresh.state["session_id"] = "s1"
+    assert _recap(fresh) == _recap(orch)
+    assert fresh._indexed_end == journal.stat().st_size
+
+
+def test_recap_from_recent_window_matches_full_read(workdir):
+    orch = orchestrator.MasterOrchestrator()
+    orch.route_command("start session")
+    orch.route_command("mark gold bullish H4")
+    orch.route_command("tag btcusd bearish M15")
+    orch.route_command("scan gold")
+    windowed = _recap(orch)
+
+    orch._recent_entries.clear()
+    from_disk = _recap(orch)
+
+    fresh = orchestrator.MasterOrchestrator()
+    fresh.state["session_id"] = orch.state["session_id"]
+    assert windowed == from_disk == _recap(fresh)
+    assert windowed["total_entries"] == 3
+
+
+def test_recap_falls_back_to_disk_once_window_overflows(workdir):
+    orch = orchestrator.MasterOrchestrator()
+    orch._recent_entries = orchestrator.deque(maxlen=2)
+    orch.state["session_id"] = "s1"
+    for prompt in ("mark xauusd", "mark btcusd", "mark eurusd"):
+        orch.route_command(prompt)
+    assert _recap(orch)["symbols"] == ["BTCUSD", "EURUSD", "XAUUSD"]
+
+
+class _CountingSchema:
+    validations = []
+
+    def __init__(self, **data):
+        self.validations.append(data["profile_name"])
+        self.profile_name = data["profile_name"]
+        self._data = dict(data, validated=True)
+
+    def dict(self):
+        return self._data
+
+
+def test_profile_cache_invalidated_when_schema_fingerprint_changes(workdir, monkeypatch):
+    agents = workdir / "config" / "agents"
+    agents.mkdir(parents=True)
+    (agents / "scout.yaml").write_text("profile_name: scout\nversion: 1\n")
+    monkeypatch.setattr(_CountingSchema, "validations", [])
+
+    # Loaded without the schema package first
+    monkeypatch.setattr(orchestrator, "_agent_profile_schema", lambda: None)
+    assert "validated" not in orchestrator.MasterOrchestrator().agents["scout"]
+
+    # A schema becoming available invalidates the unvalidated cache
+    monkeypatch.setattr(orchestrator, "_agent_profile_schema", lambda: _CountingSchema)
+    assert orchestrator.MasterOrchestrator().agents["scout"]["validated"] is True
+    assert _CountingSchema.validations == ["scout"]
+
+    # Same fingerprint: served from the cache
+    assert orchestrator.MasterOrchestrator().agents["scout"]["validated"] is True
+    assert _CountingSchema.validations == ["scout"]
+
+    # A changed schema means validating again
+    monkeypatch.setattr(orchestrator, "_profile_schema_fingerprint", lambda: "schema-v2")
+    orchestrator.MasterOrchestrator()
+    assert _CountingSchema.validations == ["scout", "scout"]